@@ -25,12 +25,16 @@
         'l10n_sv_munic',
     ],
     'data': [
+        'security/ir.model.access.csv',
+        'data/ir_cron.xml',
         'views/account_move.xml',
+        'views/dte_export_wizard_views.xml',
+        'views/res_company_views.xml',
     ],
     'assets': {
         'point_of_sale._assets_pos': [
           
-            'l10n_pos_dte/static/src/js/PaymentScreen/payment_screen.js',
+            'l10n_sv_dte/static/src/js/PaymentScreen/payment_screen.js',
         ],
        
     },
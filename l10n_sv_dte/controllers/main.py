@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+Controladores HTTP del módulo DTE El Salvador
+"""
+
+import codecs
+import csv
+import json
+import tempfile
+import zipfile
+
+from odoo import api, fields, http
+from odoo.http import request, Response, content_disposition
+
+# Columnas del índice incluido en la exportación para auditores
+COLUMNAS_INDICE = [
+    'numeroControl', 'codigoGeneracion', 'fecEmi', 'selloRecibido',
+    'montoSinImpuesto', 'totalIva', 'totalPagar', 'archivo',
+]
+
+
+class _ZipStream:
+    """
+    Destino de escritura no posicionable para zipfile
+    
+    Acumula los bytes que escribe zipfile para entregarlos por partes al
+    cliente; zipfile detecta que no es posicionable y usa descriptores de datos.
+    """
+    
+    def __init__(self):
+        self._partes = []
+    
+    def write(self, data):
+        self._partes.append(bytes(data))
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def vaciar(self):
+        """Retorna y descarta los bytes acumulados"""
+        data = b''.join(self._partes)
+        self._partes.clear()
+        return data
+
+
+def _cargar_json(texto):
+    """Interpreta un payload guardado; si no es JSON válido se exporta como texto"""
+    if not texto:
+        return None
+    try:
+        return json.loads(texto)
+    except ValueError:
+        return texto
+
+
+def _fecha_emision(dte_json, fecha):
+    """fecEmi del DTE enviado; invoice_date solo si no hay DTE generado"""
+    if isinstance(dte_json, dict):
+        fec_emi = (dte_json.get('identificacion') or {}).get('fecEmi')
+        if fec_emi:
+            return fec_emi
+    return fields.Date.to_string(fecha)
+
+
+def generar_zip_dte(filas, tamano_bloque=64 * 1024):
+    """
+    Genera un ZIP con un JSON por documento y un índice CSV, por partes
+    
+    El índice se escribe en un archivo temporal (en disco si crece) y se
+    agrega al final, por lo que la memoria usada no depende del rango.
+    
+    Args:
+        filas (iterable): Documentos de account.move._iter_dte_export
+        tamano_bloque (int): Tamaño de lectura al copiar el índice
+        
+    Yields:
+        bytes: Partes consecutivas del archivo ZIP
+    """
+    stream = _ZipStream()
+    with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as indice, \
+            zipfile.ZipFile(stream, 'w', zipfile.ZIP_DEFLATED) as zf:
+        escritor = csv.writer(codecs.getwriter('utf-8')(indice))
+        escritor.writerow(COLUMNAS_INDICE)
+        
+        for fila in filas:
+            nombre = fila['codigo_generacion'] or fila['numero_control'].replace('/', '_')
+            archivo = f"{fila['fecha'].strftime('%Y-%m')}/{nombre}.json"
+            dte_json = _cargar_json(fila['json_data'])
+            fecha_emision = _fecha_emision(dte_json, fila['fecha'])
+            documento = {
+                'numeroControl': fila['numero_control'],
+                'codigoGeneracion': fila['codigo_generacion'],
+                'selloRecibido': fila['sello'],
+                'fecEmi': fecha_emision,
+                'dteJson': dte_json,
+                'documentoFirmado': fila['documento_firmado'],
+                'respuestaMH': _cargar_json(fila['json_mh']),
+            }
+            zf.writestr(archivo, json.dumps(documento, ensure_ascii=False, indent=2))
+            escritor.writerow([
+                fila['numero_control'],
+                fila['codigo_generacion'] or '',
+                fecha_emision,
+                fila['sello'] or '',
+                fila['monto_sin_impuesto'],
+                fila['total_iva'],
+                fila['total_pagar'],
+                archivo,
+            ])
+            
+            parte = stream.vaciar()
+            if parte:
+                yield parte
+        
+        indice.seek(0)
+        with zf.open('indice.csv', 'w') as destino:
+            while True:
+                bloque = indice.read(tamano_bloque)
+                if not bloque:
+                    break
+                destino.write(bloque)
+                parte = stream.vaciar()
+                if parte:
+                    yield parte
+    
+    yield stream.vaciar()
+
+
+class DteController(http.Controller):
+    
+    @http.route('/l10n_sv_dte/exportar_zip', type='http', auth='user', methods=['GET'])
+    def exportar_zip(self, fecha_desde, fecha_hasta, company_ids='', **kw):
+        """
+        Descarga un ZIP con los DTE firmados del rango de fechas
+        
+        El contenido se genera mientras se envía, leyendo los documentos con
+        un cursor propio porque el de la petición se cierra antes de terminar.
+        """
+        env = request.env
+        env['account.move'].check_access('read')
+        
+        permitidas = set(env.user.company_ids.ids)
+        solicitadas = {int(cid) for cid in company_ids.split(',') if cid}
+        empresas = list(solicitadas & permitidas) or [env.company.id]
+        
+        desde = fields.Date.to_date(fecha_desde)
+        hasta = fields.Date.to_date(fecha_hasta)
+        registry, uid, context = env.registry, env.uid, dict(env.context)
+        
+        def contenido():
+            with registry.cursor() as cr:
+                moves = api.Environment(cr, uid, context)['account.move']
+                yield from generar_zip_dte(moves._iter_dte_export(desde, hasta, empresas))
+        
+        nombre = f"dte_{fecha_desde}_{fecha_hasta}.zip"
+        return Response(
+            contenido(),
+            headers=[
+                ('Content-Type', 'application/zip'),
+                ('Content-Disposition', content_disposition(nombre)),
+            ],
+            direct_passthrough=True,
+        )
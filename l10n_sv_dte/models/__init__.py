@@ -1 +1,8 @@
-from . import accont_move
\ No newline at end of file
+from . import accont_move
+from . import account_move_pos
+from . import account_move_dte_archive
+from . import account_move_dte_export
+from . import account_move_dte_regeneracion
+from . import account_move_dte_carga
+from . import account_move_dte_verificacion
+from . import res_company
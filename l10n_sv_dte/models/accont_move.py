@@ -1,11 +1,11 @@
 # -*- coding: utf-8 -*-
 
 from odoo import models,fields, api 
-from datetime import datetime,date
-import pytz
 
+from ..tools.dte_reloj import TZ_EL_SALVADOR
 
-class AccountMove(models.mode):
+
+class AccountMove(models.Model):
     _inherit ='account.move'
     
     def action_post(self):
@@ -26,9 +26,9 @@ class AccountMove(models.mode):
         Returns:
             _type_: _dict con la zona horaria, hora actual y URL del servicio
         """
-        tz = pytz.timezone('America/El_Salvador')
-        hora_actual = datetime.now(tz).strftime('%H:%M:%S')
-        url = f"http://dominio_ip:8113/firmardocumento" # Reemplazar con la URL real del servicio
+        tz = TZ_EL_SALVADOR
+        hora_actual = self._get_reloj_dte().marca().hora
+        url = self._get_config_dte().url_firma
         
         return {
             'tz': tz,
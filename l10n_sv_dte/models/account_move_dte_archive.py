@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+Archivo histórico de payloads DTE
+Descripción: Mueve los JSON y documentos firmados antiguos fuera de account_move
+             hacia una tabla de archivo comprimida y particionada por mes
+"""
+
+import base64
+import gzip
+import logging
+
+from dateutil.relativedelta import relativedelta
+from odoo import fields, models, api
+
+_logger = logging.getLogger(__name__)
+
+# Campos de account.move que se trasladan al archivo
+CAMPOS_PAYLOAD_DTE = ('json_data', 'documento_firmado', 'json_mh')
+
+
+def _comprimir(texto):
+    """Comprime un texto con gzip y lo codifica en base64 para un campo Binary"""
+    if not texto:
+        return False
+    return base64.b64encode(gzip.compress(texto.encode('utf-8')))
+
+
+def _descomprimir(valor):
+    """Operación inversa de _comprimir"""
+    if not valor:
+        return False
+    return gzip.decompress(base64.b64decode(valor)).decode('utf-8')
+
+
+class AccountMoveDteArchive(models.Model):
+    _name = 'account.move.dte.archive'
+    _description = 'Archivo histórico de payloads DTE'
+    _order = 'periodo desc, id desc'
+    _rec_name = 'move_id'
+    
+    move_id = fields.Many2one(
+        'account.move',
+        string='Factura',
+        required=True,
+        ondelete='cascade',
+        index=True
+    )
+    company_id = fields.Many2one('res.company', string='Empresa', required=True, index=True)
+    periodo = fields.Char(
+        string='Periodo',
+        required=True,
+        index=True,
+        help='Mes del documento (AAAA-MM), clave de partición del archivo'
+    )
+    fecha_documento = fields.Date(string='Fecha del documento')
+    fecha_archivo = fields.Datetime(string='Fecha de archivo', default=fields.Datetime.now)
+    json_data_gz = fields.Binary(string='JSON Original (gzip)', attachment=False)
+    documento_firmado_gz = fields.Binary(string='Documento Firmado (gzip)', attachment=False)
+    json_mh_gz = fields.Binary(string='Respuesta MH (gzip)', attachment=False)
+    
+    _sql_constraints = [
+        ('move_uniq', 'unique(move_id)', 'La factura ya tiene sus payloads DTE archivados.'),
+    ]
+    
+    def _get_payloads(self):
+        """
+        Descomprime los payloads archivados
+        
+        Returns:
+            dict: {move_id: {'json_data', 'documento_firmado', 'json_mh'}}
+        """
+        return {
+            archivo.move_id.id: {
+                campo: _descomprimir(archivo[f'{campo}_gz'])
+                for campo in CAMPOS_PAYLOAD_DTE
+            }
+            for archivo in self
+        }
+    
+    @api.model
+    def _archivar_payloads_dte(self, dias=None, lote=None, auto_commit=False):
+        """
+        Traslada al archivo los payloads de documentos más antiguos que `dias`
+        
+        Solo se archivan documentos ya procesados por MH; los pendientes o
+        rechazados conservan su payload para poder reenviarse.
+        
+        Recorre account_move por lotes con paginación por id (keyset) y
+        FOR UPDATE SKIP LOCKED, así solo bloquea un lote pequeño a la vez y
+        nunca espera por facturas que otro proceso esté modificando.
+        
+        Args:
+            dias (int): Antigüedad mínima en días (parámetro l10n_sv_dte.archivo_dias)
+            lote (int): Documentos por lote (parámetro l10n_sv_dte.archivo_lote)
+            auto_commit (bool): Confirmar la transacción después de cada lote (cron)
+            
+        Returns:
+            int: Cantidad de documentos archivados
+        """
+        params = self.env['ir.config_parameter'].sudo()
+        dias = dias or int(params.get_param('l10n_sv_dte.archivo_dias', 730))
+        lote = lote or int(params.get_param('l10n_sv_dte.archivo_lote', 500))
+        fecha_limite = fields.Date.context_today(self) - relativedelta(days=dias)
+        
+        # El SELECT es SQL directo: volcar antes los cambios pendientes del ORM
+        self.env['account.move'].flush_model(
+            [*CAMPOS_PAYLOAD_DTE, 'dte_archivado', 'invoice_date', 'estado_dte']
+        )
+        
+        ultimo_id = 0
+        total = 0
+        while True:
+            self.env.cr.execute("""
+                SELECT id, company_id, invoice_date, json_data, documento_firmado, json_mh
+                  FROM account_move
+                 WHERE id > %s
+                   AND invoice_date < %s
+                   AND estado_dte = 'procesado'
+                   AND NOT COALESCE(dte_archivado, FALSE)
+                   AND (json_data IS NOT NULL
+                        OR documento_firmado IS NOT NULL
+                        OR json_mh IS NOT NULL)
+                 ORDER BY id
+                 LIMIT %s
+                   FOR UPDATE SKIP LOCKED
+            """, (ultimo_id, fecha_limite, lote))
+            filas = self.env.cr.fetchall()
+            if not filas:
+                break
+            
+            ultimo_id = filas[-1][0]
+            move_ids = [fila[0] for fila in filas]
+            
+            self.create([{
+                'move_id': move_id,
+                'company_id': company_id,
+                'periodo': fecha.strftime('%Y-%m'),
+                'fecha_documento': fecha,
+                'json_data_gz': _comprimir(json_data),
+                'documento_firmado_gz': _comprimir(documento_firmado),
+                'json_mh_gz': _comprimir(json_mh),
+            } for move_id, company_id, fecha, json_data, documento_firmado, json_mh in filas])
+            
+            # SQL directo: sin recomputes, tracking ni reescritura de write_date
+            self.env.cr.execute("""
+                UPDATE account_move
+                   SET json_data = NULL,
+                       documento_firmado = NULL,
+                       json_mh = NULL,
+                       dte_archivado = TRUE
+                 WHERE id = ANY(%s)
+            """, (move_ids,))
+            self.env['account.move'].invalidate_model(
+                [*CAMPOS_PAYLOAD_DTE, 'dte_archivado'], flush=False
+            )
+            
+            total += len(filas)
+            if auto_commit:
+                self.env.cr.commit()
+        
+        _logger.info(f"Payloads DTE archivados: {total} documentos anteriores a {fecha_limite}")
+        return total
+
+
+class AccountMove(models.Model):
+    _inherit = 'account.move'
+    
+    dte_archivado = fields.Boolean(
+        string='DTE Archivado',
+        readonly=True,
+        copy=False,
+        help='Los payloads del DTE se trasladaron al archivo histórico'
+    )
+    json_data_archivo = fields.Text(string='JSON Original (archivo)', compute='_compute_payloads_archivo')
+    documento_firmado_archivo = fields.Text(string='Documento Firmado (archivo)', compute='_compute_payloads_archivo')
+    json_mh_archivo = fields.Text(string='Respuesta MH (archivo)', compute='_compute_payloads_archivo')
+    
+    def _compute_payloads_archivo(self):
+        """Recupera bajo demanda los payloads archivados para mostrarlos en el formulario"""
+        archivados = self.filtered('dte_archivado')
+        (self - archivados).update({f'{campo}_archivo': False for campo in CAMPOS_PAYLOAD_DTE})
+        
+        payloads = archivados._get_payloads_dte()
+        for move in archivados:
+            for campo in CAMPOS_PAYLOAD_DTE:
+                move[f'{campo}_archivo'] = payloads[move.id][campo]
+    
+    def _get_payloads_dte(self):
+        """
+        Retorna los payloads DTE, estén en la factura o en el archivo histórico
+        
+        Returns:
+            dict: {move_id: {'json_data', 'documento_firmado', 'json_mh'}}
+        """
+        archivados = self.filtered('dte_archivado')
+        payloads = {
+            move.id: {campo: move[campo] for campo in CAMPOS_PAYLOAD_DTE}
+            for move in self - archivados
+        }
+        if archivados:
+            archivos = self.env['account.move.dte.archive'].sudo().search([
+                ('move_id', 'in', archivados.ids)
+            ])
+            payloads.update(archivos._get_payloads())
+        return payloads
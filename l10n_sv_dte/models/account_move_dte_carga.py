@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""
+Prueba de carga del flujo POS → firmador → MH
+Descripción: Genera facturas POS sintéticas y ejecuta los flujos de firma y
+             envío contra servidores locales simulados, a una tasa de llegada
+             configurable, para dimensionar workers y firmadores
+
+Uso (base de datos de pruebas, ambiente 00):
+    odoo-bin shell -d <bd>
+    >>> env['account.move']._dte_prueba_carga(tasa=20, duracion=120, modo='lote', lote=25)
+"""
+
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from odoo import fields, models, api
+from odoo.exceptions import UserError
+
+from ..tools.dte_carga import MetricasCarga, MuestreadorBloqueos, ServidorSimulado, llegadas_poisson
+
+_logger = logging.getLogger(__name__)
+
+MODOS_PRUEBA_CARGA = ('pos', 'accion', 'lote', 'regeneracion')
+REFERENCIA_CARGA = 'DTE-PRUEBA-CARGA'
+
+
+class AccountMove(models.Model):
+    _inherit = 'account.move'
+    
+    @api.model
+    def _dte_prueba_carga(self, tasa=5.0, duracion=60, modo='pos', lote=10, hilos=8,
+                          latencia_firmador=0.05, latencia_mh=0.1, tasa_error=0.0,
+                          semilla=None, salida='/tmp/l10n_sv_dte_carga.jsonl', limpiar=True):
+        """
+        Ejecuta una prueba de carga de lazo abierto y guarda el resultado
+        
+        Cada operación corre en su propio cursor, como una petición real de un
+        worker. La latencia se mide desde la llegada programada, por lo que
+        incluye el tiempo en cola cuando los hilos no alcanzan la tasa.
+        
+        Args:
+            tasa (float): Operaciones por segundo (llegadas de Poisson)
+            duracion (float): Segundos durante los que se generan llegadas
+            modo (str): 'pos' (firmar_documentos_fc_pos), 'accion'
+                (action_firmar_y_enviar), 'lote' (firmar_documentos_fc_pos_lote)
+                o 'regeneracion' (_regenerar_dte_lote, sin pool de procesos)
+            lote (int): Documentos por operación en los modos por lote
+            hilos (int): Operaciones concurrentes (workers simulados)
+            latencia_firmador (float): Latencia simulada del firmador en segundos
+            latencia_mh (float): Latencia simulada del MH en segundos
+            tasa_error (float): Proporción de errores simulados (0 a 1)
+            semilla (int): Semilla de las llegadas para repetir una corrida
+            salida (str): Archivo JSON Lines al que se agrega el resultado
+            limpiar (bool): Eliminar las facturas, el cliente y el producto sintéticos al terminar
+            
+        Returns:
+            dict: Resultado de la prueba (el mismo que se guarda en `salida`)
+        """
+        if modo not in MODOS_PRUEBA_CARGA:
+            raise UserError(f'Modo de prueba no válido: {modo}')
+        
+        company = self.env.company
+        if company._get_config_dte().ambiente != '00':
+            raise UserError('La prueba de carga solo puede ejecutarse en una empresa con ambiente de pruebas (00).')
+        
+        registry = self.env.registry
+        uid, context = self.env.uid, dict(self.env.context)
+        llegadas = list(llegadas_poisson(tasa, duracion, semilla))
+        por_operacion = lote if modo in ('lote', 'regeneracion') else 1
+        
+        with ServidorSimulado('firmador', latencia_firmador, tasa_error) as firmador, \
+                ServidorSimulado('mh', latencia_mh, tasa_error) as mh:
+            with registry.cursor() as cr:
+                env = api.Environment(cr, uid, context)
+                config_original = env.company.read(
+                    ['url_firmador_dte', 'urls_firmador_dte', 'url_mh_dte']
+                )[0]
+                env.company.write({
+                    'url_firmador_dte': firmador.url,
+                    'urls_firmador_dte': False,
+                    'url_mh_dte': mh.url,
+                })
+                move_ids, partner_id, product_id = env['account.move']._crear_facturas_prueba_carga(
+                    len(llegadas) * por_operacion
+                )
+            
+            grupos = [
+                move_ids[i * por_operacion:(i + 1) * por_operacion]
+                for i in range(len(llegadas))
+            ]
+            metricas = MetricasCarga()
+            
+            def operacion(ids, llegada, inicio_prueba):
+                inicio = time.monotonic()
+                error, documentos = None, 0
+                try:
+                    with registry.cursor() as cr:
+                        moves = api.Environment(cr, uid, context)['account.move'].browse(ids)
+                        documentos = moves._ejecutar_operacion_carga(modo)
+                        if documentos < len(ids):
+                            error = 'documento_rechazado'
+                except Exception as e:
+                    error = type(e).__name__
+                fin = time.monotonic()
+                metricas.registrar(fin - (inicio_prueba + llegada), fin - inicio, documentos, error)
+            
+            def sesiones_esperando():
+                with registry.cursor() as cr:
+                    cr.execute("""
+                        SELECT count(*)
+                          FROM pg_stat_activity
+                         WHERE datname = current_database()
+                           AND wait_event_type = 'Lock'
+                    """)
+                    return cr.fetchone()[0]
+            
+            try:
+                with MuestreadorBloqueos(sesiones_esperando) as muestreador, \
+                        ThreadPoolExecutor(max_workers=hilos) as pool:
+                    inicio_prueba = time.monotonic()
+                    for llegada, ids in zip(llegadas, grupos):
+                        espera = inicio_prueba + llegada - time.monotonic()
+                        if espera > 0:
+                            time.sleep(espera)
+                        pool.submit(operacion, ids, llegada, inicio_prueba)
+                duracion_real = time.monotonic() - inicio_prueba
+            finally:
+                with registry.cursor() as cr:
+                    env = api.Environment(cr, uid, context)
+                    env.company.write({
+                        campo: config_original[campo]
+                        for campo in ('url_firmador_dte', 'urls_firmador_dte', 'url_mh_dte')
+                    })
+                    if limpiar:
+                        env['account.move'].browse(move_ids).exists().unlink()
+                        env['product.product'].browse(product_id).exists().unlink()
+                        env['res.partner'].browse(partner_id).exists().unlink()
+            
+            resultado = {
+                'fecha': datetime.now(timezone.utc).isoformat(),
+                'base_datos': self.env.cr.dbname,
+                'parametros': {
+                    'modo': modo,
+                    'tasa': tasa,
+                    'duracion': duracion,
+                    'lote': por_operacion,
+                    'hilos': hilos,
+                    'latencia_firmador': latencia_firmador,
+                    'latencia_mh': latencia_mh,
+                    'tasa_error': tasa_error,
+                    'semilla': semilla,
+                },
+                'duracion_real': round(duracion_real, 3),
+                'solicitudes_firmador': firmador.atendidas,
+                'solicitudes_mh': mh.atendidas,
+                **metricas.resumen(duracion_real),
+                'bloqueos_bd': muestreador.resumen(),
+            }
+        
+        if salida:
+            with open(salida, 'a', encoding='utf-8') as archivo:
+                archivo.write(json.dumps(resultado, ensure_ascii=False) + '\n')
+        _logger.info(f"Prueba de carga DTE ({modo}): {json.dumps(resultado, ensure_ascii=False)}")
+        return resultado
+    
+    @api.model
+    def _crear_facturas_prueba_carga(self, cantidad, tamano_lote=500):
+        """
+        Crea facturas sintéticas equivalentes a las que genera el POS
+        
+        Returns:
+            tuple: (ids de las facturas creadas, id del cliente, id del producto),
+                ya confirmados en la base de datos
+        """
+        partner = self.env['res.partner'].create({
+            'name': 'Cliente Prueba de Carga',
+            'vat': '0000000000',
+            'email': 'carga@example.com',
+        })
+        product = self.env['product.product'].create({
+            'name': 'Producto Prueba de Carga',
+            'default_code': 'CARGA001',
+            'list_price': 10.00,
+        })
+        
+        move_ids = []
+        for inicio in range(0, cantidad, tamano_lote):
+            moves = self.create([{
+                'move_type': 'out_invoice',
+                'partner_id': partner.id,
+                'invoice_date': fields.Date.context_today(self),
+                'ref': REFERENCIA_CARGA,
+                'invoice_origin': f'POS/CARGA/{inicio + i:06d}',
+                'invoice_line_ids': [(0, 0, {
+                    'product_id': product.id,
+                    'quantity': 1 + (inicio + i) % 5,
+                    'price_unit': 10.00,
+                })],
+            } for i in range(min(tamano_lote, cantidad - inicio))])
+            move_ids.extend(moves.ids)
+            self.env.cr.commit()
+        
+        return move_ids, partner.id, product.id
+    
+    def _ejecutar_operacion_carga(self, modo):
+        """
+        Ejecuta una operación de la prueba de carga sobre las facturas
+        
+        Returns:
+            int: Documentos procesados correctamente
+        """
+        if modo == 'pos':
+            return sum(1 for move in self if move.firmar_documentos_fc_pos()['success'])
+        if modo == 'accion':
+            for move in self:
+                move.action_firmar_y_enviar()
+            return len(self)
+        if modo == 'lote':
+            return sum(1 for r in self.firmar_documentos_fc_pos_lote().values() if r['success'])
+        # Cada operación corre en un hilo: no se hace fork de procesos desde aquí
+        resultados = self._regenerar_dte_lote(procesos=1)
+        return sum(1 for r in resultados.values() if r['success'])
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+Exportación masiva de DTE firmados
+Descripción: Lectura por lotes de los DTE de un rango de fechas mediante un
+             cursor del lado del servidor, con memoria acotada
+"""
+
+import uuid
+
+from odoo import models
+
+from .account_move_dte_archive import _descomprimir
+
+
+class AccountMove(models.Model):
+    _inherit = 'account.move'
+    
+    def _iter_dte_export(self, fecha_desde, fecha_hasta, company_ids, tamano_lote=200):
+        """
+        Recorre los DTE firmados del rango usando un cursor del lado del servidor
+        
+        Solo se mantiene en memoria un lote de `tamano_lote` filas a la vez.
+        Los payloads archivados se leen y descomprimen desde el archivo histórico.
+        
+        Args:
+            fecha_desde (date): Fecha inicial (inclusive)
+            fecha_hasta (date): Fecha final (inclusive)
+            company_ids (list): Empresas a exportar
+            tamano_lote (int): Filas por FETCH
+            
+        Yields:
+            dict: Datos de un documento con sus payloads
+        """
+        self.check_access('read')
+        
+        # El cursor lee directamente de la base: volcar antes lo pendiente del ORM
+        self.env['account.move'].flush_model()
+        self.env['account.move.dte.archive'].flush_model()
+        
+        cr = self.env.cr
+        nombre_cursor = f"dte_export_{uuid.uuid4().hex}"
+        cr.execute(f"""
+            DECLARE {nombre_cursor} NO SCROLL CURSOR FOR
+            SELECT m.id, m.company_id, m.name, m.uuid_generation_code, m.confirmacion, m.invoice_date,
+                   m.amount_untaxed, m.amount_tax, m.amount_total,
+                   m.json_data, m.documento_firmado, m.json_mh,
+                   a.json_data_gz, a.documento_firmado_gz, a.json_mh_gz
+              FROM account_move m
+              LEFT JOIN account_move_dte_archive a ON a.move_id = m.id
+             WHERE m.company_id = ANY(%s)
+               AND m.invoice_date BETWEEN %s AND %s
+               AND (m.documento_firmado IS NOT NULL OR a.id IS NOT NULL)
+             ORDER BY m.invoice_date, m.id
+        """, (list(company_ids), fecha_desde, fecha_hasta))
+        
+        try:
+            while True:
+                cr.execute(f"FETCH FORWARD %s FROM {nombre_cursor}", (tamano_lote,))
+                filas = cr.fetchall()
+                if not filas:
+                    break
+                for (move_id, company_id, name, codigo, sello, fecha, sin_impuesto, iva, total,
+                     json_data, documento_firmado, json_mh,
+                     json_data_gz, documento_firmado_gz, json_mh_gz) in filas:
+                    yield {
+                        'id': move_id,
+                        'company_id': company_id,
+                        'numero_control': name,
+                        'codigo_generacion': codigo,
+                        'sello': sello,
+                        'fecha': fecha,
+                        'monto_sin_impuesto': sin_impuesto,
+                        'total_iva': iva,
+                        'total_pagar': total,
+                        'json_data': json_data or _descomprimir(json_data_gz),
+                        'documento_firmado': documento_firmado or _descomprimir(documento_firmado_gz),
+                        'json_mh': json_mh or _descomprimir(json_mh_gz),
+                    }
+        finally:
+            cr.execute(f"CLOSE {nombre_cursor}")
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+Regeneración masiva de DTE en borrador
+Descripción: Reconstruye y firma lotes grandes de DTE (p. ej. al cierre de mes,
+             tras cambios en los datos de la empresa) construyendo los payloads
+             en un pool de procesos a partir de instantáneas de datos.
+             La acción solo encola los documentos; el trabajo lo hace un cron.
+"""
+
+import logging
+import multiprocessing
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+from odoo import fields, models
+from odoo.exceptions import UserError, ValidationError
+
+from ..tools.dte_payload import construir_payload_dte
+
+_logger = logging.getLogger(__name__)
+
+# Por debajo de esta cantidad de documentos no compensa iniciar procesos
+MINIMO_DOCUMENTOS_POOL = 50
+
+# Tope de procesos si no se configura l10n_sv_dte.procesos_pool
+MAXIMO_PROCESOS_POR_DEFECTO = 4
+
+
+class AccountMove(models.Model):
+    _inherit = 'account.move'
+    
+    dte_regeneracion_pendiente = fields.Boolean(
+        string='Regeneración DTE Pendiente',
+        readonly=True,
+        copy=False,
+        help='Documento encolado para regenerar y firmar su DTE'
+    )
+    
+    def _get_procesos_pool(self):
+        """
+        Cantidad de procesos para los pools de construcción y verificación de DTE
+        
+        Returns:
+            int: Parámetro l10n_sv_dte.procesos_pool, o por defecto el menor entre
+                 MAXIMO_PROCESOS_POR_DEFECTO y los CPU disponibles
+        """
+        por_defecto = min(MAXIMO_PROCESOS_POR_DEFECTO, os.cpu_count() or 1)
+        return max(1, int(self.env['ir.config_parameter'].sudo().get_param(
+            'l10n_sv_dte.procesos_pool', por_defecto
+        )))
+    
+    def _construir_payloads_lote(self, facturas, marca, procesos=None):
+        """
+        Construye los payloads del lote, en paralelo si el lote lo amerita
+        
+        Los procesos solo reciben instantáneas inmutables y no tocan el ORM
+        ni la base de datos. Se usa 'fork' para que hereden el módulo ya importado.
+        
+        Args:
+            facturas (list): FacturaSnapshot de _cargar_snapshots_dte
+            marca (MarcaEmision): Fecha y hora de emisión común del lote
+            procesos (int): Procesos del pool (por defecto _get_procesos_pool)
+            
+        Returns:
+            dict: {id de factura: payload}
+        """
+        if procesos is None:
+            procesos = self._get_procesos_pool()
+        
+        codigos = [str(uuid.uuid4()).upper() for _factura in facturas]
+        marcas = [marca] * len(facturas)
+        ids = [factura.id for factura in facturas]
+        
+        if procesos <= 1 or len(facturas) < MINIMO_DOCUMENTOS_POOL:
+            return dict(zip(ids, map(construir_payload_dte, facturas, codigos, marcas)))
+        
+        chunksize = max(1, len(facturas) // (procesos * 4))
+        with ProcessPoolExecutor(max_workers=procesos, mp_context=multiprocessing.get_context('fork')) as pool:
+            return dict(zip(ids, pool.map(construir_payload_dte, facturas, codigos, marcas, chunksize=chunksize)))
+    
+    def action_regenerar_dte_lote(self):
+        """
+        Acción para encolar la reconstrucción y firma de los DTE en borrador seleccionados
+        
+        El trabajo pesado (pool de procesos y llamadas al firmador) no se hace
+        dentro de la petición HTTP: se marca cada documento y se dispara el cron.
+        """
+        moves = self.filtered(lambda m: m.estado_dte == 'draft')
+        if not moves:
+            raise UserError('No hay documentos en borrador para regenerar.')
+        
+        moves.write({'dte_regeneracion_pendiente': True})
+        self.env.ref('l10n_sv_dte.ir_cron_regenerar_dte')._trigger()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'message': f'DTE encolados para regenerar y firmar: {len(moves)} de {len(self)}',
+                'type': 'success' if len(moves) == len(self) else 'warning',
+                'sticky': False,
+            }
+        }
+    
+    def _cron_regenerar_dte_pendientes(self, lote=None, auto_commit=False):
+        """
+        Regenera y firma por lotes los DTE encolados por action_regenerar_dte_lote
+        
+        Args:
+            lote (int): Documentos por lote (parámetro l10n_sv_dte.regeneracion_lote)
+            auto_commit (bool): Confirmar la transacción después de cada lote (cron)
+            
+        Returns:
+            dict: Resultado por id de factura {id: {'success', 'message'}}
+        """
+        lote = lote or int(self.env['ir.config_parameter'].sudo().get_param(
+            'l10n_sv_dte.regeneracion_lote', 500
+        ))
+        
+        resultados = {}
+        while True:
+            moves = self.search([('dte_regeneracion_pendiente', '=', True)], order='id', limit=lote)
+            if not moves:
+                break
+            
+            resultados.update(moves._regenerar_dte_lote())
+            moves.write({'dte_regeneracion_pendiente': False})
+            if auto_commit:
+                self.env.cr.commit()
+        
+        exitosos = sum(1 for r in resultados.values() if r['success'])
+        _logger.info(f"DTE regenerados y firmados: {exitosos} de {len(resultados)}")
+        return resultados
+    
+    def _regenerar_dte_lote(self, procesos=None):
+        """
+        Reconstruye los payloads de los DTE en borrador y los envía a firmar
+        
+        Args:
+            procesos (int): Procesos para construir payloads (opcional)
+            
+        Returns:
+            dict: Resultado por id de factura {id: {'success', 'message'}}
+        """
+        moves = self.filtered(lambda m: m.estado_dte == 'draft')
+        resultados = {
+            move.id: {'success': False, 'message': 'Este documento ya ha sido procesado.'}
+            for move in self - moves
+        }
+        if not moves:
+            return resultados
+        
+        # Misma fecha y hora de emisión para todo el lote
+        marca = self._get_reloj_dte().marca()
+        snapshots = moves._cargar_snapshots_dte()
+        payloads = self._construir_payloads_lote(list(snapshots.values()), marca, procesos=procesos)
+        _logger.info(f"Payloads DTE construidos: {len(payloads)}")
+        
+        # Firmas en paralelo entre las instancias del firmador de cada empresa
+        firmas = moves._firmar_payloads_concurrente(payloads)
+        
+        for move in moves:
+            try:
+                with self.env.cr.savepoint():
+                    resultado = move._firmar_dte(payload=payloads[move.id], firma=firmas[move.id])
+                resultados[move.id] = {'success': True, 'message': resultado['message']}
+            except (UserError, ValidationError) as e:
+                resultados[move.id] = {'success': False, 'message': str(e)}
+            except Exception as e:
+                _logger.exception(f"Error inesperado al regenerar DTE {move.name}: {e}")
+                resultados[move.id] = {'success': False, 'message': f'Error inesperado: {str(e)}'}
+        
+        return resultados
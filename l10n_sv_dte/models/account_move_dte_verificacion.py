@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+"""
+Verificación de DTE firmados con caché por documento
+Descripción: Verifica la firma JWS y el contenido de los documentos firmados;
+             el veredicto se guarda junto con una huella de los artefactos y
+             solo se recalcula cuando estos (o el certificado) cambian.
+             La verificación por rango se encola y la ejecuta un cron.
+"""
+
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from odoo import fields, models
+from odoo.exceptions import UserError
+
+from ..tools.dte_verificacion import huella_artefactos, verificar_documento, verificar_documento_args
+
+_logger = logging.getLogger(__name__)
+
+# Por debajo de esta cantidad de documentos pendientes no compensa usar procesos
+MINIMO_VERIFICACIONES_POOL = 50
+
+# Columnas del veredicto en caché, escritas también por SQL directo
+CAMPOS_VERIFICACION_DTE = [
+    'dte_verificacion_estado', 'dte_verificacion_mensaje',
+    'dte_verificacion_huella', 'dte_verificacion_fecha',
+]
+
+
+class AccountMove(models.Model):
+    _inherit = 'account.move'
+    
+    dte_verificacion_estado = fields.Selection([
+        ('valido', 'Válido'),
+        ('invalido', 'Inválido')
+    ], string='Verificación DTE', readonly=True, copy=False)
+    
+    dte_verificacion_mensaje = fields.Char(
+        string='Resultado de verificación',
+        readonly=True,
+        copy=False
+    )
+    
+    dte_verificacion_huella = fields.Char(
+        string='Huella verificada',
+        readonly=True,
+        copy=False,
+        help='SHA-256 del documento firmado, el JSON original y el certificado verificados'
+    )
+    
+    dte_verificacion_fecha = fields.Datetime(
+        string='Fecha de verificación',
+        readonly=True,
+        copy=False
+    )
+    
+    dte_verificacion_pendiente = fields.Boolean(
+        string='Verificación DTE Pendiente',
+        readonly=True,
+        copy=False,
+        help='Documento encolado para verificar su firma en segundo plano'
+    )
+    
+    def action_verificar_dte(self):
+        """
+        Acción para verificar la firma y el contenido de los DTE seleccionados
+        """
+        resultados = self._verificar_dte()
+        invalidos = [self.browse(move_id).name for move_id, (estado, _msg) in resultados.items() if estado != 'valido']
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'message': (
+                    f"DTE con firma o contenido inválido: {', '.join(invalidos)}" if invalidos
+                    else 'DTE verificados correctamente'
+                ),
+                'type': 'danger' if invalidos else 'success',
+                'sticky': bool(invalidos),
+            }
+        }
+    
+    def _verificar_dte(self, forzar=False):
+        """
+        Verifica los documentos firmados, usando el veredicto en caché si los
+        artefactos guardados no cambiaron
+        
+        Args:
+            forzar (bool): Ignorar el veredicto en caché
+            
+        Returns:
+            dict: {id de factura: (estado, mensaje)}
+        """
+        resultados = {}
+        payloads = self._get_payloads_dte()
+        
+        for move in self:
+            config = move._get_config_dte()
+            if not config.certificado_firmador:
+                raise UserError('Debe configurar el certificado público del firmador en la empresa.')
+            
+            payload = payloads[move.id]
+            huella = huella_artefactos(payload['documento_firmado'], payload['json_data'], config.huella_certificado)
+            if not forzar and move.dte_verificacion_estado and move.dte_verificacion_huella == huella:
+                resultados[move.id] = (move.dte_verificacion_estado, move.dte_verificacion_mensaje)
+                continue
+            
+            estado, mensaje = verificar_documento(
+                payload['documento_firmado'], payload['json_data'], config.certificado_firmador
+            )
+            move.write({
+                'dte_verificacion_estado': estado,
+                'dte_verificacion_mensaje': mensaje,
+                'dte_verificacion_huella': huella,
+                'dte_verificacion_fecha': fields.Datetime.now(),
+            })
+            resultados[move.id] = (estado, mensaje)
+        
+        return resultados
+    
+    def _encolar_verificacion_dte(self, fecha_desde, fecha_hasta, company_ids):
+        """
+        Marca los DTE firmados del rango para que los verifique el cron
+        
+        La petición HTTP solo marca los documentos (una sentencia SQL) y
+        dispara ir_cron_verificar_dte; el pool de procesos corre en el cron.
+        
+        Args:
+            fecha_desde (date): Fecha inicial (inclusive)
+            fecha_hasta (date): Fecha final (inclusive)
+            company_ids (list): Empresas a verificar
+            
+        Returns:
+            int: Cantidad de documentos encolados
+        """
+        self.check_access('read')
+        self.env['account.move'].flush_model(['company_id', 'invoice_date', 'documento_firmado'])
+        self.env['account.move.dte.archive'].flush_model(['move_id'])
+        
+        self.env.cr.execute("""
+            UPDATE account_move m
+               SET dte_verificacion_pendiente = TRUE
+             WHERE m.company_id = ANY(%s)
+               AND m.invoice_date BETWEEN %s AND %s
+               AND (m.documento_firmado IS NOT NULL
+                    OR EXISTS (SELECT 1 FROM account_move_dte_archive a WHERE a.move_id = m.id))
+        """, (list(company_ids), fecha_desde, fecha_hasta))
+        encolados = self.env.cr.rowcount
+        self.env['account.move'].invalidate_model(['dte_verificacion_pendiente'], flush=False)
+        
+        if encolados:
+            self.env.ref('l10n_sv_dte.ir_cron_verificar_dte')._trigger()
+        return encolados
+    
+    def _cron_verificar_dte_pendientes(self, auto_commit=False):
+        """
+        Verifica los DTE encolados por _encolar_verificacion_dte
+        
+        Se verifica por empresa el rango de fechas que cubre sus documentos
+        encolados; los que ya tienen veredicto para su huella salen de la caché.
+        
+        Args:
+            auto_commit (bool): Confirmar la transacción después de cada empresa (cron)
+            
+        Returns:
+            dict: Conteo acumulado como el de _verificar_dte_rango
+        """
+        resumen = dict.fromkeys(('valido', 'invalido', 'en_cache', 'sin_certificado'), 0)
+        grupos = self._read_group(
+            [('dte_verificacion_pendiente', '=', True)],
+            ['company_id'],
+            ['invoice_date:min', 'invoice_date:max'],
+        )
+        for company, fecha_desde, fecha_hasta in grupos:
+            resultado = self._verificar_dte_rango(fecha_desde, fecha_hasta, company_ids=company.ids)
+            for llave, cantidad in resultado.items():
+                resumen[llave] += cantidad
+            
+            self.env.cr.execute("""
+                UPDATE account_move
+                   SET dte_verificacion_pendiente = FALSE
+                 WHERE company_id = %s
+                   AND dte_verificacion_pendiente
+                   AND invoice_date BETWEEN %s AND %s
+            """, (company.id, fecha_desde, fecha_hasta))
+            self.env['account.move'].invalidate_model(['dte_verificacion_pendiente'], flush=False)
+            if auto_commit:
+                self.env.cr.commit()
+        
+        return resumen
+    
+    def _verificar_dte_rango(self, fecha_desde, fecha_hasta, company_ids=None, procesos=None, tamano_lote=500):
+        """
+        Verifica en paralelo los DTE firmados de un rango de fechas
+        
+        Los documentos se leen por lotes con el cursor del servidor de la
+        exportación; solo se verifican los que no tienen un veredicto en caché
+        para su huella actual. El pool de procesos se inicia únicamente cuando
+        un lote tiene al menos MINIMO_VERIFICACIONES_POOL documentos pendientes.
+        
+        Args:
+            fecha_desde (date): Fecha inicial (inclusive)
+            fecha_hasta (date): Fecha final (inclusive)
+            company_ids (list): Empresas a verificar (por defecto las activas)
+            procesos (int): Procesos del pool (por defecto _get_procesos_pool)
+            tamano_lote (int): Documentos por lote
+            
+        Returns:
+            dict: Conteo por resultado {'valido', 'invalido', 'sin_certificado'} y
+                cuántos de ellos se tomaron de la caché ('en_cache')
+        """
+        if procesos is None:
+            procesos = self._get_procesos_pool()
+        
+        # Los veredictos se actualizan por SQL directo: volcar antes lo pendiente del ORM
+        self.env['account.move'].flush_model(CAMPOS_VERIFICACION_DTE)
+        
+        companies = self.env['res.company'].browse(company_ids) if company_ids else self.env.companies
+        configs = {company.id: company._get_config_dte() for company in companies}
+        resumen = dict.fromkeys(('valido', 'invalido', 'en_cache', 'sin_certificado'), 0)
+        pool = None
+        
+        def verificar_pendientes(pendientes, huellas):
+            nonlocal pool
+            if not pendientes:
+                return
+            if pool is None and procesos > 1 and len(pendientes) >= MINIMO_VERIFICACIONES_POOL:
+                pool = ProcessPoolExecutor(max_workers=procesos, mp_context=multiprocessing.get_context('fork'))
+            if pool is None:
+                veredictos = map(verificar_documento_args, pendientes)
+            else:
+                veredictos = pool.map(verificar_documento_args, pendientes,
+                                      chunksize=max(1, len(pendientes) // (procesos * 4)))
+            for move_id, (estado, mensaje) in veredictos:
+                resumen[estado] += 1
+                self.env.cr.execute("""
+                    UPDATE account_move
+                       SET dte_verificacion_estado = %s,
+                           dte_verificacion_mensaje = %s,
+                           dte_verificacion_huella = %s,
+                           dte_verificacion_fecha = (now() at time zone 'UTC')
+                     WHERE id = %s
+                """, (estado, mensaje, huellas[move_id], move_id))
+        
+        try:
+            filas = self._iter_dte_export(fecha_desde, fecha_hasta, list(configs), tamano_lote=tamano_lote)
+            lote = []
+            for fila in filas:
+                lote.append(fila)
+                if len(lote) < tamano_lote:
+                    continue
+                verificar_pendientes(*self._filtrar_verificaciones_pendientes(lote, configs, resumen))
+                lote = []
+            verificar_pendientes(*self._filtrar_verificaciones_pendientes(lote, configs, resumen))
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True)
+        
+        self.env['account.move'].invalidate_model(CAMPOS_VERIFICACION_DTE, flush=False)
+        _logger.info(f"Verificación DTE {fecha_desde} - {fecha_hasta}: {resumen}")
+        return resumen
+    
+    def _filtrar_verificaciones_pendientes(self, lote, configs, resumen):
+        """
+        Separa los documentos del lote que requieren verificación
+        
+        Returns:
+            tuple: (argumentos para verificar_documento_args, {id: huella})
+        """
+        if not lote:
+            return [], {}
+        
+        self.env['account.move'].flush_model(['dte_verificacion_estado', 'dte_verificacion_huella'])
+        self.env.cr.execute("""
+            SELECT id, dte_verificacion_estado, dte_verificacion_huella
+              FROM account_move
+             WHERE id = ANY(%s)
+        """, ([fila['id'] for fila in lote],))
+        en_cache = {move_id: (estado, huella) for move_id, estado, huella in self.env.cr.fetchall()}
+        
+        pendientes, huellas = [], {}
+        for fila in lote:
+            config = configs[fila['company_id']]
+            if not config.certificado_firmador:
+                resumen['sin_certificado'] += 1
+                continue
+            
+            huella = huella_artefactos(fila['documento_firmado'], fila['json_data'], config.huella_certificado)
+            estado, huella_cache = en_cache.get(fila['id'], (None, None))
+            if estado and huella_cache == huella:
+                resumen[estado] += 1
+                resumen['en_cache'] += 1
+                continue
+            
+            huellas[fila['id']] = huella
+            pendientes.append((fila['id'], fila['documento_firmado'], fila['json_data'], config.certificado_firmador))
+        
+        return pendientes, huellas
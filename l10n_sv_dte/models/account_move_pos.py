@@ -9,11 +9,16 @@ Descripción: Demostración de integración con API de facturación electrónica
 import json
 import uuid
 import requests
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from odoo import fields, models, api
 from odoo.exceptions import UserError, ValidationError
 import logging
 
+from ..tools import dte_payload
+from ..tools.dte_firmador import SesionesPorHilo, crear_sesion_http, enviar_a_firmar, obtener_balanceador
+from ..tools.dte_reloj import RELOJ_SV
+from ..tools.dte_snapshot import CompaniaSnapshot, FacturaSnapshot, LineaSnapshot, PartnerSnapshot
+
 _logger = logging.getLogger(__name__)
 
 
@@ -60,10 +65,95 @@ class AccountMove(models.Model):
     
     # Métodos principales
     
-    def _preparar_payload_dte(self):
+    def _cargar_snapshots_dte(self):
+        """
+        Lee en bloque los datos del DTE de todas las facturas del recordset
+        
+        Returns:
+            dict: {id de factura: FacturaSnapshot}
+        """
+        # Precarga en bloque: una consulta por modelo para todo el recordset
+        self.mapped('invoice_line_ids.product_id')
+        self.mapped('partner_id.state_id')
+        
+        campos_empresa = self.env['res.company']._fields
+        campos_partner = self.env['res.partner']._fields
+        
+        empresas = {
+            company.id: CompaniaSnapshot(
+                vat=company.vat,
+                name=company.name,
+                street=company.street,
+                phone=company.phone,
+                email=company.email,
+                ambiente_dte=company._get_config_dte().ambiente,
+                password_firma_dte=company._get_config_dte().password_firma,
+                registro_comercial=company.registro_comercial if 'registro_comercial' in campos_empresa else "000000-0",
+                codigo_actividad=company.codigo_actividad if 'codigo_actividad' in campos_empresa else "10005",
+                desc_actividad=company.desc_actividad if 'desc_actividad' in campos_empresa else "Comercio",
+            )
+            for company in self.company_id
+        }
+        
+        snapshots = {}
+        for move in self:
+            partner = move.partner_id
+            snapshots[move.id] = FacturaSnapshot(
+                id=move.id,
+                name=move.name,
+                invoice_date=move.invoice_date,
+                amount_untaxed=move.amount_untaxed,
+                amount_tax=move.amount_tax,
+                amount_total=move.amount_total,
+                amount_to_text=move.amount_to_text,
+                narration=move.narration,
+                payment_reference=move.payment_reference,
+                lineas=tuple(
+                    LineaSnapshot(
+                        display_type=line.display_type,
+                        name=line.name,
+                        quantity=line.quantity,
+                        price_unit=line.price_unit,
+                        price_subtotal=line.price_subtotal,
+                        discount=line.discount,
+                        tipo_item_dte=line.product_id.tipo_item_dte,
+                        default_code=line.product_id.default_code,
+                    )
+                    for line in move.invoice_line_ids
+                ),
+                partner=PartnerSnapshot(
+                    vat=partner.vat,
+                    name=partner.name,
+                    state_code=partner.state_id.code,
+                    street=partner.street,
+                    phone=partner.phone,
+                    email=partner.email,
+                    registro_comercial=partner.registro_comercial if 'registro_comercial' in campos_partner else None,
+                ),
+                company=empresas[move.company_id.id],
+            )
+        return snapshots
+    
+    def _snapshot_dte(self):
+        """Retorna la instantánea de datos DTE de esta factura"""
+        self.ensure_one()
+        return self._cargar_snapshots_dte()[self.id]
+    
+    def _get_reloj_dte(self):
+        """
+        Retorna el reloj de El Salvador usado para fecEmi/horEmi
+        
+        Punto de extensión para inyectar un reloj fijo en pruebas y mediciones.
+        """
+        return RELOJ_SV
+    
+    def _preparar_payload_dte(self, marca=None):
         """
         Prepara el payload JSON para enviar al servicio de firma
         
+        Args:
+            marca (MarcaEmision): Instante de emisión común de un lote (opcional)
+        
         Returns:
             dict: Estructura completa del DTE según especificaciones MH
         """
@@ -72,43 +162,11 @@ class AccountMove(models.Model):
         # Generar UUID único
         codigo_generacion = str(uuid.uuid4()).upper()
         
-        # Preparar items del documento
-        items = self._preparar_items_documento()
-        
-        # Preparar información del receptor
-        receptor = self._preparar_receptor()
-        
-        # Preparar resumen financiero
-        resumen = self._preparar_resumen()
-        
-        # Estructura completa del DTE
-        dte_json = {
-            "identificacion": {
-                "version": 1,
-                "ambiente": self.company_id.ambiente_dte or "00",  # 00: Pruebas, 01: Producción
-                "tipoDte": "01",  # Factura
-                "numeroControl": self.name,
-                "codigoGeneracion": codigo_generacion,
-                "tipoModelo": 1,
-                "tipoOperacion": 1,
-                "fecEmi": self.invoice_date.strftime('%Y-%m-%d'),
-                "horEmi": datetime.now().strftime('%H:%M:%S'),
-                "tipoMoneda": "USD"
-            },
-            "emisor": self._preparar_emisor(),
-            "receptor": receptor,
-            "cuerpoDocumento": items,
-            "resumen": resumen,
-            "extension": self._preparar_extension(),
-            "apendice": self._preparar_apendice()
-        }
-        
-        return {
-            "nit": self.company_id.vat or "0000000000000",
-            "activo": True,
-            "passwordPri": self.company_id.password_firma_dte,
-            "dteJson": dte_json
-        }
+        return dte_payload.construir_payload_dte(
+            self._snapshot_dte(),
+            codigo_generacion,
+            marca or self._get_reloj_dte().marca()
+        )
     
     def _preparar_items_documento(self):
         """
@@ -117,137 +175,27 @@ class AccountMove(models.Model):
         Returns:
             list: Lista de items con estructura requerida
         """
-        items = []
-        num_item = 1
-        
-        for line in self.invoice_line_ids:
-            if line.display_type in ('line_note', 'line_section'):
-                continue
-                
-            precio_unitario = round(line.price_unit * 1.13, 4)  # Precio con IVA
-            venta_gravada = round(line.price_subtotal * 1.13, 4)
-            descuento = round(precio_unitario * line.quantity * (line.discount / 100.0), 4)
-            iva_item = round(line.price_subtotal * 0.13, 4)
-            
-            item = {
-                "numItem": num_item,
-                "tipoItem": int(line.product_id.tipo_item_dte or 1),
-                "numeroDocumento": None,
-                "cantidad": line.quantity,
-                "codigo": line.product_id.default_code[:25] if line.product_id.default_code else None,
-                "codTributo": None,
-                "uniMedida": 59,  # Unidad
-                "descripcion": line.name[:1000],
-                "precioUni": precio_unitario,
-                "montoDescu": descuento,
-                "ventaNoSuj": 0.00,
-                "ventaExenta": 0.00,
-                "ventaGravada": venta_gravada,
-                "tributos": None,
-                "psv": line.price_unit,
-                "noGravado": 0.00,
-                "ivaItem": iva_item
-            }
-            items.append(item)
-            num_item += 1
-            
-        return items
+        return dte_payload.preparar_items(self._snapshot_dte().lineas)
     
     def _preparar_receptor(self):
         """Prepara información del receptor/cliente"""
-        partner = self.partner_id
-        
-        return {
-            "tipoDocumento": "36",  # DUI por defecto
-            "numDocumento": partner.vat or "0000000000",
-            "nrc": partner.registro_comercial if hasattr(partner, 'registro_comercial') else None,
-            "nombre": partner.name[:200],
-            "codActividad": None,
-            "descActividad": None,
-            "direccion": {
-                "departamento": partner.state_id.code[:2] if partner.state_id else "01",
-                "municipio": "01",
-                "complemento": partner.street[:200] if partner.street else "Ciudad"
-            },
-            "telefono": partner.phone[:25] if partner.phone else None,
-            "correo": partner.email[:100] if partner.email else None
-        }
+        return dte_payload.preparar_receptor(self._snapshot_dte().partner)
     
     def _preparar_emisor(self):
         """Prepara información del emisor/empresa"""
-        company = self.company_id
-        
-        return {
-            "nit": company.vat or "0000000000000",
-            "nrc": company.registro_comercial if hasattr(company, 'registro_comercial') else "000000-0",
-            "nombre": company.name[:200],
-            "codActividad": company.codigo_actividad if hasattr(company, 'codigo_actividad') else "10005",
-            "descActividad": company.desc_actividad if hasattr(company, 'desc_actividad') else "Comercio",
-            "nombreComercial": company.name[:200],
-            "tipoEstablecimiento": "01",
-            "direccion": {
-                "departamento": "01",
-                "municipio": "01",
-                "complemento": company.street[:200] if company.street else "San Salvador"
-            },
-            "telefono": company.phone[:25] if company.phone else "0000-0000",
-            "correo": company.email[:100],
-            "codEstableMH": None,
-            "codEstable": None,
-            "codPuntoVentaMH": None,
-            "codPuntoVenta": None
-        }
+        return dte_payload.preparar_emisor(self._snapshot_dte().company)
     
     def _preparar_resumen(self):
         """Prepara el resumen financiero del documento"""
-        total_gravado = round(self.amount_untaxed * 1.13, 2)
-        total_iva = round(self.amount_tax, 2)
-        
-        return {
-            "totalNoSuj": 0.00,
-            "totalExenta": 0.00,
-            "totalGravada": total_gravado,
-            "subTotalVentas": total_gravado,
-            "descuNoSuj": 0.00,
-            "descuExenta": 0.00,
-            "descuGravada": 0.00,
-            "porcentajeDescuento": 0.00,
-            "totalDescu": 0.00,
-            "tributos": None,
-            "subTotal": total_gravado,
-            "ivaRete1": 0.00,
-            "reteRenta": 0.00,
-            "montoTotalOperacion": total_gravado,
-            "totalNoGravado": 0.00,
-            "totalPagar": self.amount_total,
-            "totalLetras": self.amount_to_text,
-            "totalIva": total_iva,
-            "saldoFavor": 0.00,
-            "condicionOperacion": 1,  # 1: Contado, 2: Crédito
-            "pagos": None,
-            "numPagoElectronico": None
-        }
+        return dte_payload.preparar_resumen(self._snapshot_dte())
     
     def _preparar_extension(self):
         """Prepara datos de extensión del documento"""
-        return {
-            "nombEntrega": None,
-            "docuEntrega": None,
-            "nombRecibe": None,
-            "docuRecibe": None,
-            "observaciones": self.narration[:3000] if self.narration else None,
-            "placaVehiculo": None
-        }
+        return dte_payload.preparar_extension(self._snapshot_dte())
     
     def _preparar_apendice(self):
         """Prepara información adicional en apéndice"""
-        return [
-            {
-                "campo": "numeroInterno",
-                "etiqueta": "Número Interno",
-                "valor": self.payment_reference or self.name
-            }
-        ]
+        return dte_payload.preparar_apendice(self._snapshot_dte())
     
     def action_firmar_dte(self):
         """
@@ -255,22 +203,36 @@ class AccountMove(models.Model):
         Puede ser llamada desde botón en vista o automáticamente
         """
         self.ensure_one()
+        self._firmar_dte()
+        return True
+    
+    def _firmar_dte(self, session=None, payload=None, firma=None):
+        """
+        Prepara, guarda y firma el DTE del documento
+        
+        Args:
+            session (requests.Session): Sesión HTTP compartida (opcional, para lotes)
+            payload (dict): Payload ya construido (opcional, si no se prepara aquí)
+            firma (dict): Resultado de una firma ya realizada para `payload` (opcional)
+        """
+        self.ensure_one()
         
         if self.estado_dte != 'draft':
             raise UserError('Este documento ya ha sido procesado.')
         
-        if not self.company_id.url_firmador_dte:
+        config = self._get_config_dte()
+        if not config.urls_firmador:
             raise UserError('Debe configurar la URL del servicio firmador en la empresa.')
         
         # Preparar payload
-        payload = self._preparar_payload_dte()
+        if payload is None:
+            payload = self._preparar_payload_dte()
         
         # Guardar JSON original
         self.json_data = json.dumps(payload['dteJson'], ensure_ascii=False)
         
         # Firmar documento
-        url_firma = f"{self.company_id.url_firmador_dte}/firmardocumento/"
-        resultado = self._enviar_a_firmar(url_firma, payload)
+        resultado = firma or self._firmar_balanceado(payload, session=session)
         
         if resultado['success']:
             self.write({
@@ -282,69 +244,95 @@ class AccountMove(models.Model):
         else:
             raise ValidationError(f"Error al firmar: {resultado['message']}")
         
-        return True
+        return resultado
     
-    def _enviar_a_firmar(self, url, payload):
+    def _enviar_a_firmar(self, url, payload, session=None):
         """
         Envía el documento al servicio de firma digital
         
         Args:
             url (str): URL del servicio firmador
             payload (dict): Datos del documento a firmar
+            session (requests.Session): Sesión HTTP compartida (opcional)
             
         Returns:
             dict: Resultado de la operación
         """
-        headers = {
-            'Content-Type': 'application/json',
-        }
+        return enviar_a_firmar(url, payload, session=session, timeout=self._get_config_dte().timeout_firmador)
+    
+    def _firmar_balanceado(self, payload, session=None):
+        """
+        Firma en la instancia del firmador con menos carga, con conmutación
+        automática a las demás instancias configuradas si falla
+        """
+        config = self._get_config_dte()
+        balanceador = obtener_balanceador(config.urls_firmador)
+        return balanceador.firmar(payload, session=session, timeout=config.timeout_firmador)
+    
+    def _firmar_payloads_concurrente(self, payloads):
+        """
+        Firma en paralelo los payloads de un lote, repartidos entre las
+        instancias saludables del firmador de cada empresa
         
-        try:
-            response = requests.post(
-                url, 
-                headers=headers, 
-                data=json.dumps(payload),
-                timeout=30
-            )
-            response.raise_for_status()
-            
-            json_response = response.json()
+        Los hilos solo hacen las llamadas HTTP, cada uno con su propia sesión;
+        el ORM se usa únicamente en el hilo principal. El pool de cada empresa
+        se dimensiona con su propia configuración.
+        
+        Args:
+            payloads (dict): {id de factura: payload}
             
-            if json_response.get('status') == 'OK':
-                return {
-                    'success': True,
-                    'documento': json_response.get('body'),
-                    'message': 'Documento firmado correctamente'
-                }
-            else:
-                return {
-                    'success': False,
-                    'message': json_response.get('body', {}).get('mensaje', 'Error desconocido')
-                }
-                
-        except requests.exceptions.Timeout:
-            return {
-                'success': False,
-                'message': 'Tiempo de espera agotado al conectar con el servicio'
-            }
-        except requests.exceptions.RequestException as e:
-            _logger.error(f"Error en servicio de firma: {e}")
-            return {
-                'success': False,
-                'message': f'Error de conexión: {str(e)}'
-            }
-        except Exception as e:
-            _logger.error(f"Error inesperado al firmar: {e}")
-            return {
-                'success': False,
-                'message': f'Error inesperado: {str(e)}'
-            }
+        Returns:
+            dict: {id de factura: resultado de la firma}
+        """
+        def firmar(balanceador, sesiones, payload, timeout):
+            return balanceador.firmar(payload, session=sesiones.actual(), timeout=timeout)
+        
+        futuros = {}
+        pools = []
+        sesiones_empresa = []
+        try:
+            for company in self.company_id:
+                config = company._get_config_dte()
+                balanceador = obtener_balanceador(config.urls_firmador)
+                sesiones = SesionesPorHilo()
+                sesiones_empresa.append(sesiones)
+                pool = ThreadPoolExecutor(max_workers=config.pool_firmador)
+                pools.append(pool)
+                for move in self.filtered(lambda m: m.company_id == company and m.id in payloads):
+                    futuros[move.id] = pool.submit(
+                        firmar, balanceador, sesiones, payloads[move.id], config.timeout_firmador
+                    )
+            return {move_id: futuro.result() for move_id, futuro in futuros.items()}
+        finally:
+            for pool in pools:
+                pool.shutdown(wait=True)
+            for sesiones in sesiones_empresa:
+                sesiones.cerrar()
     
     def action_enviar_a_mh(self):
         """
         Envía el DTE firmado al Ministerio de Hacienda
         """
         self.ensure_one()
+        self._enviar_dte_mh()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'message': 'DTE enviado y procesado correctamente',
+                'type': 'success',
+                'sticky': False,
+            }
+        }
+    
+    def _enviar_dte_mh(self, session=None):
+        """
+        Envía el DTE firmado al MH y guarda el sello de recepción
+        
+        Args:
+            session (requests.Session): Sesión HTTP compartida (opcional, para lotes)
+        """
+        self.ensure_one()
         
         if self.estado_dte != 'firmado':
             raise UserError('El documento debe estar firmado antes de enviarlo.')
@@ -352,9 +340,15 @@ class AccountMove(models.Model):
         if not self.documento_firmado:
             raise UserError('No se encontró el documento firmado.')
         
+        # Verificar integridad antes de enviar (veredicto en caché si no hubo cambios)
+        if self._get_config_dte().certificado_firmador:
+            estado, mensaje = self._verificar_dte()[self.id]
+            if estado != 'valido':
+                raise UserError(f'El documento firmado no es válido: {mensaje}')
+        
         # Preparar payload para MH
         payload = {
-            "ambiente": self.company_id.ambiente_dte or "00",
+            "ambiente": self._get_config_dte().ambiente,
             "idEnvio": self.id,
             "version": 1,
             "tipoDte": "01",
@@ -366,7 +360,7 @@ class AccountMove(models.Model):
         url_mh = self._get_url_mh()
         
         # Enviar a MH
-        resultado = self._enviar_a_mh(url_mh, payload)
+        resultado = self._enviar_a_mh(url_mh, payload, session=session)
         
         if resultado['success']:
             self.write({
@@ -375,52 +369,44 @@ class AccountMove(models.Model):
                 'json_mh': json.dumps(resultado.get('respuesta'), ensure_ascii=False)
             })
             self.message_post(body="DTE procesado por MH correctamente", message_type="notification")
-            return {
-                'type': 'ir.actions.client',
-                'tag': 'display_notification',
-                'params': {
-                    'message': 'DTE enviado y procesado correctamente',
-                    'type': 'success',
-                    'sticky': False,
-                }
-            }
         else:
             self.estado_dte = 'rechazado'
             raise ValidationError(f"Error del MH: {resultado['message']}")
+        
+        return resultado
+    
+    def _get_config_dte(self):
+        """Retorna la configuración DTE en caché de la empresa del documento"""
+        return (self.company_id[:1] or self.env.company)._get_config_dte()
     
     def _get_url_mh(self):
         """Retorna la URL del MH según el ambiente configurado"""
-        ambiente = self.company_id.ambiente_dte or "00"
-        
-        urls = {
-            "00": "https://apitest.dtes.mh.gob.sv/fesv/recepciondte",  # Pruebas
-            "01": "https://api.dtes.mh.gob.sv/fesv/recepciondte"       # Producción
-        }
-        
-        return urls.get(ambiente, urls["00"])
+        return self._get_config_dte().url_mh
     
-    def _enviar_a_mh(self, url, payload):
+    def _enviar_a_mh(self, url, payload, session=None):
         """
         Envía el DTE firmado al Ministerio de Hacienda
         
         Args:
             url (str): URL del endpoint del MH
             payload (dict): Datos del documento firmado
+            session (requests.Session): Sesión HTTP compartida (opcional)
             
         Returns:
             dict: Resultado de la operación
         """
+        config = self._get_config_dte()
         headers = {
             'Content-Type': 'application/json',
-            'Authorization': f'Bearer {self.company_id.token_mh}'
+            'Authorization': f'Bearer {config.token_mh}'
         }
         
         try:
-            response = requests.post(
+            response = (session or requests).post(
                 url,
                 headers=headers,
                 data=json.dumps(payload),
-                timeout=60
+                timeout=config.timeout_mh
             )
             
             json_response = response.json()
@@ -451,4 +437,126 @@ class AccountMove(models.Model):
         Acción combinada: firma y envía el DTE en un solo paso
         """
         self.action_firmar_dte()
-        return self.action_enviar_a_mh()
\ No newline at end of file
+        return self.action_enviar_a_mh()
+    
+    # Métodos para el Punto de Venta
+    
+    def firmar_documentos_fc_pos(self):
+        """
+        Firma y envía al MH la factura generada desde el POS
+        
+        Returns:
+            dict: Resultado con los datos que muestra el POS
+        """
+        self.ensure_one()
+        return self.firmar_documentos_fc_pos_lote()[self.id]
+    
+    def firmar_documentos_fc_pos_lote(self):
+        """
+        Firma y envía al MH varias facturas del POS en una sola llamada RPC
+        
+        Cada documento se procesa en su propio savepoint, de modo que un
+        error no revierte los documentos ya sellados del mismo lote. Los
+        datos de todo el lote se leen juntos, comparten la misma fecha y hora
+        de emisión y se reutiliza una sola sesión HTTP para el firmador y el MH.
+        
+        Returns:
+            dict: Resultado por id de factura {id: {'success', 'message', 'payload'}}
+        """
+        moves = self.exists()
+        resultados = {
+            move_id: {'success': False, 'message': 'No se encontró la factura.'}
+            for move_id in set(self.ids) - set(moves.ids)
+        }
+        
+        # Lectura en bloque de los borradores y marca de emisión común
+        borradores = moves.filtered(lambda m: m.estado_dte == 'draft')
+        snapshots = borradores._cargar_snapshots_dte()
+        marca = self._get_reloj_dte().marca()
+        
+        payloads = {}
+        for move_id, snapshot in snapshots.items():
+            try:
+                payloads[move_id] = dte_payload.construir_payload_dte(
+                    snapshot, str(uuid.uuid4()).upper(), marca
+                )
+            except Exception as e:
+                _logger.exception(f"Error al preparar DTE {snapshot.name}: {e}")
+                resultados[move_id] = {'success': False, 'message': f'Error inesperado: {str(e)}'}
+        
+        # Firmas en paralelo entre las instancias del firmador
+        firmas = borradores._firmar_payloads_concurrente(payloads)
+        
+        # Los envíos al MH son secuenciales en este hilo: una sola sesión basta
+        with crear_sesion_http() as session:
+            for move in moves:
+                if move.id in resultados:
+                    continue
+                try:
+                    with self.env.cr.savepoint():
+                        resultados[move.id] = move._procesar_dte_pos(
+                            session=session,
+                            payload=payloads.get(move.id),
+                            firma=firmas.get(move.id)
+                        )
+                except (UserError, ValidationError) as e:
+                    resultados[move.id] = {'success': False, 'message': str(e)}
+                except Exception as e:
+                    _logger.exception(f"Error inesperado al procesar DTE {move.name}: {e}")
+                    resultados[move.id] = {'success': False, 'message': f'Error inesperado: {str(e)}'}
+        
+        return resultados
+    
+    def _procesar_dte_pos(self, session=None, payload=None, firma=None):
+        """
+        Firma y envía el documento según su estado actual; si ya fue
+        procesado solo retorna sus datos (reintentos tras trabajar sin conexión)
+        """
+        self.ensure_one()
+        
+        if self.estado_dte == 'draft':
+            self._firmar_dte(session=session, payload=payload, firma=firma)
+        
+        if self.estado_dte == 'firmado':
+            self._enviar_dte_mh(session=session)
+        
+        if self.estado_dte != 'procesado':
+            return {
+                'success': False,
+                'message': f'El documento {self.name} está en estado {self.estado_dte}.'
+            }
+        
+        return {
+            'success': True,
+            'message': 'DTE procesado correctamente',
+            'payload': {
+                'qr_link': self._get_qr_link(),
+                'confirmacion': self.confirmacion,
+                'numero_factura': self.name,
+                'uuid_generation_code': self.uuid_generation_code,
+                'estado_dte': self.estado_dte,
+                'fecha_factura': fields.Date.to_string(self.invoice_date),
+            }
+        }
+    
+    def _get_qr_link(self):
+        """Retorna la URL de consulta pública del DTE en el MH"""
+        self.ensure_one()
+        if not self.uuid_generation_code:
+            return False
+        
+        # La fecha de emisión es la del DTE enviado (fecEmi), no invoice_date
+        json_data = self._get_payloads_dte()[self.id]['json_data']
+        identificacion = json.loads(json_data).get('identificacion', {}) if json_data else {}
+        fecha_emision = identificacion.get('fecEmi') or (
+            self.invoice_date and self.invoice_date.strftime('%Y-%m-%d')
+        )
+        if not fecha_emision:
+            return False
+        
+        ambiente = self._get_config_dte().ambiente
+        return (
+            "https://admin.factura.gob.sv/consultaPublica"
+            f"?ambiente={ambiente}&codGen={self.uuid_generation_code}"
+            f"&fechaEmi={fecha_emision}"
+        )
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+Configuración DTE de la empresa
+Descripción: Resuelve y guarda en caché la configuración de envío DTE por
+             empresa; se invalida en todos los workers al modificarla
+"""
+
+import base64
+
+from odoo import fields, models, api, tools
+
+from ..tools.dte_config import ConfigDTE, URLS_MH
+from ..tools.dte_verificacion import huella_certificado
+
+# Campos que forman parte de la configuración en caché
+CAMPOS_CONFIG_DTE = {
+    'ambiente_dte',
+    'url_firmador_dte',
+    'urls_firmador_dte',
+    'password_firma_dte',
+    'token_mh',
+    'url_mh_dte',
+    'timeout_firmador_dte',
+    'timeout_mh_dte',
+    'pool_firmador_dte',
+    'certificado_firmador_dte',
+}
+
+
+class ResCompany(models.Model):
+    _inherit = 'res.company'
+    
+    urls_firmador_dte = fields.Text(
+        string='Instancias adicionales del firmador',
+        help='Una URL por línea; las firmas se reparten entre estas instancias y la URL principal'
+    )
+    url_mh_dte = fields.Char(
+        string='URL Recepción MH',
+        help='Endpoint de recepción del MH; si está vacío se usa la URL oficial del ambiente'
+    )
+    timeout_firmador_dte = fields.Integer(
+        string='Tiempo de espera firmador (s)',
+        default=30
+    )
+    timeout_mh_dte = fields.Integer(
+        string='Tiempo de espera MH (s)',
+        default=60
+    )
+    certificado_firmador_dte = fields.Binary(
+        string='Certificado público del firmador',
+        help='Certificado (PEM, DER o .crt del MH) para verificar los documentos firmados'
+    )
+    pool_firmador_dte = fields.Integer(
+        string='Conexiones simultáneas DTE',
+        default=4,
+        help='Firmas en paralelo por lote; cada hilo reutiliza su propia sesión HTTP'
+    )
+    
+    def write(self, vals):
+        res = super().write(vals)
+        if CAMPOS_CONFIG_DTE.intersection(vals):
+            # Invalida la caché en este y, mediante la señalización del registro, en los demás workers
+            self.env.registry.clear_cache()
+        return res
+    
+    def _get_config_dte(self):
+        """
+        Retorna la configuración DTE resuelta de la empresa
+        
+        Returns:
+            ConfigDTE: Configuración inmutable en caché por worker
+        """
+        self.ensure_one()
+        return self._get_config_dte_cache(self.id)
+    
+    @api.model
+    @tools.ormcache('company_id')
+    def _get_config_dte_cache(self, company_id):
+        company = self.sudo().browse(company_id)
+        ambiente = company.ambiente_dte or "00"
+        certificado = base64.b64decode(company.certificado_firmador_dte) if company.certificado_firmador_dte else None
+        urls_firmador = [company.url_firmador_dte] + (company.urls_firmador_dte or '').splitlines()
+        urls_firmador = tuple(dict.fromkeys(url.strip().rstrip('/') for url in urls_firmador if url and url.strip()))
+        return ConfigDTE(
+            company_id=company.id,
+            ambiente=ambiente,
+            url_firmador=company.url_firmador_dte or None,
+            urls_firmador=urls_firmador,
+            url_mh=company.url_mh_dte or URLS_MH.get(ambiente, URLS_MH["00"]),
+            token_mh=company.token_mh,
+            password_firma=company.password_firma_dte,
+            timeout_firmador=company.timeout_firmador_dte or 30,
+            timeout_mh=company.timeout_mh_dte or 60,
+            pool_firmador=max(1, company.pool_firmador_dte or 1),
+            certificado_firmador=certificado,
+            huella_certificado=huella_certificado(certificado),
+        )
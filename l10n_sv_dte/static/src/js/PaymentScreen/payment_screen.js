@@ -21,11 +21,51 @@ patch(PaymentScreen.prototype, {
 
     },
 
+    async _finalizeValidation() {
+        await super._finalizeValidation(...arguments);
+        // Tras sincronizar, procesar en un solo RPC todos los DTE pendientes
+        // (la orden actual y las que quedaron pendientes sin conexión)
+        await this._procesar_dte_pendientes();
+    },
+
+    _get_tipo_dte() {
+        // Sin tipo configurado en el POS se emite Factura (01), el único tipo
+        // que generan firmar_documentos_fc_pos y firmar_documentos_fc_pos_lote
+        return this.document_type_sv?.value || "01";
+    },
+
+    _get_account_move_id(order) {
+        const move = order.raw?.account_move ?? order.account_move;
+        return (move && typeof move === "object" ? move.id : move) || null;
+    },
+
+    async _procesar_dte_pendientes() {
+        const pendientes = this.pos.models["pos.order"].filter(
+            (order) =>
+                order.finalized &&
+                order.to_invoice &&
+                !order.uiState?.dte_procesado &&
+                this._get_account_move_id(order)
+        );
+        if (!pendientes.length) {
+            return;
+        }
+
+        const ids = pendientes.map((order) => this._get_account_move_id(order));
+        const resumen = await this._get_functions_account_batch(ids);
+
+        for (const order of pendientes) {
+            if (resumen[this._get_account_move_id(order)]?.success) {
+                order.uiState.dte_procesado = true;
+            }
+        }
+    },
+
 
 
     async _get_functions_account(id) {
         try {
-            const tipo_factura = this.document_type_sv.value;
+            const tipo_factura = this._get_tipo_dte();
         
         let result;
 
@@ -85,6 +125,75 @@ patch(PaymentScreen.prototype, {
         return { success: false };
     } 
 
+},
+
+    async _get_functions_account_batch(ids) {
+        try {
+            const tipo_factura = this._get_tipo_dte();
+
+        // Mapeo de métodos por lote según tipo de factura
+        const methodMap = {
+            "01": "firmar_documentos_fc_pos_lote",
+        };
+
+        if (!methodMap[tipo_factura]) {
+            this.dialog.add(AlertDialog, {
+                title: "Error",
+                body: "Diario no configurado para DTE",
+            });
+            return {};
+        }
+
+        // Una sola llamada para todo el lote: { id: { success, message, payload } }
+        const results = await this.orm.call(
+            "account.move",
+            methodMap[tipo_factura],
+            [ids]
+        );
+
+        const resumen = {};
+        const errores = [];
+        for (const id of ids) {
+            const result = results[String(id)] || { success: false, message: "Sin respuesta del servidor" };
+            if (!result.success) {
+                errores.push(`${id}: ${result.message}`);
+                resumen[id] = { success: false };
+                continue;
+            }
+            const payload = result.payload || {};
+            resumen[id] = {
+                success: true,
+                qr_link: payload.qr_link || null,
+                confirmacion: payload.confirmacion || null,
+                numero_factura: payload.numero_factura || null,
+                uuid_generation_code: payload.uuid_generation_code || null,
+                estado_dte: payload.estado_dte || null,
+                fecha_factura: payload.fecha_factura || null,
+            };
+        }
+
+        if (errores.length) {
+            this.dialog.add(AlertDialog, {
+                title: "Error en DTE",
+                body: errores.join("\n"),
+            });
+        }
+
+        this.notification.add(_t(`DTE procesados: ${ids.length - errores.length} de ${ids.length}`), {
+            type: errores.length ? "warning" : "success",
+            sticky: false,
+        })
+
+        return resumen;
+    } catch (e) {
+        console.error("Error:", e);
+        this.dialog.add(AlertDialog, {
+            title: "Error",
+            body: "Ocurrió un error inesperado: " + (e.message || ""),
+        });
+        return {};
+    }
+
 }
 
 
@@ -6,8 +6,15 @@ Tests para el módulo de Facturación Electrónica El Salvador
 from odoo.tests.common import TransactionCase
 from odoo.exceptions import UserError, ValidationError
 from unittest.mock import patch, MagicMock
+import base64
+import io
 import json
 import uuid
+import zipfile
+from datetime import datetime
+
+import pytz
+from odoo.addons.l10n_sv_dte.tools.dte_reloj import reloj_fijo
 
 
 class TestAccountMoveFEL(TransactionCase):
@@ -346,4 +353,282 @@ class TestAccountMoveFEL(TransactionCase):
         
         # Debe contener las secciones principales
         self.assertIn('identificacion', json_parsed)
-        self.assertIn('cuerpoDocumento', json_parsed)
\ No newline at end of file
+        self.assertIn('cuerpoDocumento', json_parsed)
+    
+    @patch('requests.Session')
+    def test_firmar_documentos_fc_pos_lote(self, mock_session_cls):
+        """Test: Procesar varias facturas POS en una sola llamada"""
+        invoice2 = self.invoice.copy()
+        
+        def _post(url, **kwargs):
+            response = MagicMock()
+            response.status_code = 200
+            if 'firmardocumento' in url:
+                response.json.return_value = {'status': 'OK', 'body': 'documento_firmado'}
+            else:
+                response.json.return_value = {
+                    'estado': 'PROCESADO',
+                    'selloRecibido': 'SELLO123ABC',
+                }
+            return response
+        
+        session = mock_session_cls.return_value
+        session.__enter__.return_value = session
+        session.post.side_effect = _post
+        
+        moves = self.invoice | invoice2
+        resultados = moves.firmar_documentos_fc_pos_lote()
+        
+        # Un resultado por factura: dos firmas y dos envíos al MH
+        self.assertEqual(set(resultados), set(moves.ids))
+        self.assertTrue(all(r['success'] for r in resultados.values()))
+        self.assertEqual(resultados[self.invoice.id]['payload']['confirmacion'], 'SELLO123ABC')
+        self.assertEqual(session.post.call_count, 4)
+        session.close.assert_called()
+        self.assertEqual(set(moves.mapped('estado_dte')), {'procesado'})
+    
+    def test_archivar_payloads_dte(self):
+        """Test: Archivar payloads antiguos y recuperarlos de forma transparente"""
+        self.invoice.write({
+            'estado_dte': 'procesado',
+            'json_data': '{"identificacion": {}}',
+            'documento_firmado': 'documento_test',
+            'json_mh': '{"estado": "PROCESADO"}',
+        })
+        
+        total = self.env['account.move.dte.archive']._archivar_payloads_dte(dias=1, lote=1)
+        
+        self.assertGreaterEqual(total, 1)
+        self.assertTrue(self.invoice.dte_archivado)
+        self.assertFalse(self.invoice.documento_firmado)
+        
+        # El formulario y el código leen el payload desde el archivo
+        self.assertEqual(self.invoice.documento_firmado_archivo, 'documento_test')
+        payloads = self.invoice._get_payloads_dte()
+        self.assertEqual(payloads[self.invoice.id]['json_mh'], '{"estado": "PROCESADO"}')
+        
+        archivo = self.env['account.move.dte.archive'].search([('move_id', '=', self.invoice.id)])
+        self.assertEqual(archivo.periodo, '2024-01')
+    
+    def test_exportar_zip_dte(self):
+        """Test: Exportar DTE firmados en un ZIP con índice CSV"""
+        from odoo.addons.l10n_sv_dte.controllers.main import generar_zip_dte
+        
+        self.invoice.write({
+            'estado_dte': 'procesado',
+            'json_data': '{"identificacion": {"fecEmi": "2024-01-16"}}',
+            'documento_firmado': 'documento_test',
+            'uuid_generation_code': 'ABC-123',
+            'confirmacion': 'SELLO123ABC',
+        })
+        
+        filas = self.env['account.move']._iter_dte_export(
+            '2024-01-01', '2024-01-31', [self.company.id], tamano_lote=1
+        )
+        contenido = b''.join(generar_zip_dte(filas))
+        
+        with zipfile.ZipFile(io.BytesIO(contenido)) as zf:
+            self.assertIn('2024-01/ABC-123.json', zf.namelist())
+            documento = json.loads(zf.read('2024-01/ABC-123.json'))
+            self.assertEqual(documento['documentoFirmado'], 'documento_test')
+            # La fecha de emisión es la del DTE enviado, no invoice_date
+            self.assertEqual(documento['fecEmi'], '2024-01-16')
+            indice = zf.read('indice.csv').decode('utf-8')
+            self.assertIn('SELLO123ABC', indice)
+            self.assertIn('2024-01-16', indice)
+            self.assertNotIn('2024-01-15', indice)
+    
+    @patch('odoo.addons.l10n_sv_dte.models.account_move_dte_regeneracion.MINIMO_DOCUMENTOS_POOL', 0)
+    def test_construir_payloads_lote_pool(self):
+        """Test: Los payloads del pool de procesos coinciden con los del ORM"""
+        moves = self.invoice | self.invoice.copy({'invoice_date': '2024-01-15'})
+        snapshots = moves._cargar_snapshots_dte()
+        
+        marca = reloj_fijo(datetime(2024, 1, 15, 16, 30, tzinfo=pytz.utc)).marca()
+        
+        payloads = moves._construir_payloads_lote(list(snapshots.values()), marca, procesos=2)
+        
+        self.assertEqual(set(payloads), set(moves.ids))
+        esperado = self.invoice._preparar_payload_dte()['dteJson']
+        obtenido = payloads[self.invoice.id]['dteJson']
+        for seccion in ('emisor', 'receptor', 'cuerpoDocumento', 'resumen', 'extension', 'apendice'):
+            self.assertEqual(obtenido[seccion], esperado[seccion])
+    
+    def test_regenerar_dte_lote_encolado(self):
+        """Test: La acción solo encola los documentos y el cron los procesa"""
+        AccountMove = type(self.env['account.move'])
+        with patch.object(AccountMove, '_regenerar_dte_lote', autospec=True, return_value={}) as mock_regenerar:
+            self.invoice.action_regenerar_dte_lote()
+            
+            mock_regenerar.assert_not_called()
+            self.assertTrue(self.invoice.dte_regeneracion_pendiente)
+            
+            self.env['account.move']._cron_regenerar_dte_pendientes()
+        
+        mock_regenerar.assert_called_once()
+        self.assertFalse(self.invoice.dte_regeneracion_pendiente)
+    
+    def test_verificar_dte_rango_encolado(self):
+        """Test: El asistente solo encola la verificación del rango y el cron la ejecuta"""
+        self.invoice.write({'documento_firmado': 'documento_test'})
+        asistente = self.env['account.move.dte.export'].create({
+            'fecha_desde': '2024-01-01',
+            'fecha_hasta': '2024-01-31',
+        })
+        
+        AccountMove = type(self.env['account.move'])
+        with patch.object(AccountMove, '_verificar_dte_rango', autospec=True, return_value={}) as mock_rango:
+            asistente.action_verificar()
+            
+            mock_rango.assert_not_called()
+            self.assertTrue(self.invoice.dte_verificacion_pendiente)
+            
+            self.env['account.move']._cron_verificar_dte_pendientes()
+        
+        mock_rango.assert_called_once()
+        self.assertEqual(mock_rango.call_args.kwargs['company_ids'], self.invoice.company_id.ids)
+        self.assertFalse(self.invoice.dte_verificacion_pendiente)
+    
+    def test_snapshot_dte_inmutable(self):
+        """Test: Las instantáneas son inmutables y el builder no requiere ORM"""
+        from odoo.addons.l10n_sv_dte.tools import dte_payload
+        
+        snapshot = self.invoice._snapshot_dte()
+        
+        with self.assertRaises(AttributeError):
+            snapshot.name = 'Otro'
+        self.assertEqual(snapshot.partner.name, 'Cliente Test')
+        self.assertEqual(len(snapshot.lineas), 1)
+        
+        marca = reloj_fijo(datetime(2024, 1, 15, 16, 30, tzinfo=pytz.utc)).marca()
+        payload = dte_payload.construir_payload_dte(snapshot, 'CODIGO', marca)
+        self.assertEqual(payload['dteJson']['identificacion']['codigoGeneracion'], 'CODIGO')
+        self.assertEqual(payload['dteJson']['receptor'], self.invoice._preparar_receptor())
+    
+    def test_reloj_sv_hora_emision(self):
+        """Test: horEmi en hora de El Salvador y común para todo el lote"""
+        reloj = reloj_fijo(datetime(2024, 1, 15, 16, 30, 5, tzinfo=pytz.utc))
+        
+        with patch.object(type(self.invoice), '_get_reloj_dte', return_value=reloj):
+            invoice2 = self.invoice.copy({'invoice_date': False})
+            invoice3 = self.invoice.copy({'invoice_date': '2024-01-10'})
+            payload1 = self.invoice._preparar_payload_dte()
+            payload2 = invoice2._preparar_payload_dte()
+            payload3 = invoice3._preparar_payload_dte()
+        
+        # UTC-6: 16:30:05 UTC son las 10:30:05 en El Salvador
+        identificacion = payload1['dteJson']['identificacion']
+        self.assertEqual(identificacion['horEmi'], '10:30:05')
+        self.assertEqual(identificacion['fecEmi'], '2024-01-15')
+        self.assertEqual(payload2['dteJson']['identificacion']['horEmi'], '10:30:05')
+        self.assertEqual(payload2['dteJson']['identificacion']['fecEmi'], '2024-01-15')
+        # fecEmi y horEmi salen de la misma marca, aunque invoice_date difiera
+        self.assertEqual(payload3['dteJson']['identificacion']['fecEmi'], '2024-01-15')
+    
+    def test_config_dte_cache_recarga(self):
+        """Test: La configuración en caché se recarga al cambiar la empresa"""
+        config = self.company._get_config_dte()
+        self.assertEqual(config.url_firma, 'https://api-test.firmador.com/firmardocumento/')
+        self.assertIs(self.company._get_config_dte(), config)
+        
+        self.company.write({
+            'url_firmador_dte': 'https://firmador-2.test',
+            'timeout_firmador_dte': 5,
+        })
+        
+        config = self.company._get_config_dte()
+        self.assertEqual(config.url_firma, 'https://firmador-2.test/firmardocumento/')
+        self.assertEqual(config.timeout_firmador, 5)
+    
+    def test_balanceador_firmador_conmutacion(self):
+        """Test: Conmutación automática a otra instancia del firmador"""
+        import requests
+        from odoo.addons.l10n_sv_dte.tools.dte_firmador import BalanceadorFirmador
+        
+        def _post(url, **kwargs):
+            if url.startswith('https://firmador-1'):
+                raise requests.exceptions.ConnectionError()
+            response = MagicMock()
+            response.json.return_value = {'status': 'OK', 'body': 'documento_firmado'}
+            return response
+        
+        session = MagicMock()
+        session.post.side_effect = _post
+        balanceador = BalanceadorFirmador(('https://firmador-1', 'https://firmador-2'))
+        
+        resultado = balanceador.firmar({}, session=session)
+        
+        self.assertTrue(resultado['success'])
+        self.assertEqual(resultado['firmador'], 'https://firmador-2')
+        instancias = {i.url: i for i in balanceador.instancias}
+        self.assertFalse(instancias['https://firmador-1'].saludable)
+        self.assertTrue(all(i.pendientes == 0 for i in instancias.values()))
+        
+        # La instancia caída queda relegada mientras dura la espera
+        balanceador.firmar({}, session=session)
+        self.assertEqual(session.post.call_count, 3)
+    
+    def test_config_dte_varios_firmadores(self):
+        """Test: La configuración incluye todas las instancias del firmador"""
+        self.company.urls_firmador_dte = "https://firmador-2.test/\nhttps://api-test.firmador.com\n"
+        
+        config = self.company._get_config_dte()
+        
+        self.assertEqual(config.urls_firmador, ('https://api-test.firmador.com', 'https://firmador-2.test'))
+    
+    def test_servidores_simulados_prueba_carga(self):
+        """Test: Los servidores simulados de la prueba de carga responden como el firmador y el MH"""
+        from odoo.addons.l10n_sv_dte.tools.dte_carga import ServidorSimulado
+        
+        payload = self.invoice._preparar_payload_dte()
+        
+        with ServidorSimulado('firmador') as firmador, ServidorSimulado('mh') as mh:
+            firma = self.invoice._enviar_a_firmar(f"{firmador.url}/firmardocumento/", payload)
+            respuesta = self.invoice._enviar_a_mh(mh.url, {
+                "ambiente": "00",
+                "documento": firma['documento'],
+                "codigoGeneracion": payload['dteJson']['identificacion']['codigoGeneracion'],
+            })
+        
+        self.assertTrue(firma['success'])
+        self.assertEqual(len(firma['documento'].split('.')), 3)
+        self.assertTrue(respuesta['success'])
+        self.assertTrue(respuesta['sello'])
+    
+    def test_verificar_dte_cache(self):
+        """Test: Verificación JWS con veredicto en caché hasta que cambian los artefactos"""
+        from cryptography.hazmat.primitives import hashes, serialization
+        from cryptography.hazmat.primitives.asymmetric import padding, rsa
+        from odoo.addons.l10n_sv_dte.tools.dte_verificacion import verificar_documento
+        
+        def b64url(data):
+            return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+        
+        clave = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        publica = clave.public_key().public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+        dte = {'identificacion': {'codigoGeneracion': 'ABC-123'}, 'resumen': {'totalPagar': 226.0}}
+        entrada = f"{b64url(json.dumps({'alg': 'RS512'}).encode())}.{b64url(json.dumps(dte).encode())}"
+        firma = clave.sign(entrada.encode('ascii'), padding.PKCS1v15(), hashes.SHA512())
+        
+        self.company.certificado_firmador_dte = base64.b64encode(publica)
+        self.invoice.write({
+            'json_data': json.dumps(dte, indent=2),
+            'documento_firmado': f"{entrada}.{b64url(firma)}",
+        })
+        
+        ruta = 'odoo.addons.l10n_sv_dte.models.account_move_dte_verificacion.verificar_documento'
+        with patch(ruta, wraps=verificar_documento) as mock_verificar:
+            self.assertEqual(self.invoice._verificar_dte()[self.invoice.id][0], 'valido')
+            
+            # Sin cambios en los artefactos se usa el veredicto en caché
+            self.invoice._verificar_dte()
+            self.assertEqual(mock_verificar.call_count, 1)
+            
+            # Un cambio en el JSON original invalida la caché
+            self.invoice.json_data = json.dumps({'identificacion': {}})
+            estado, mensaje = self.invoice._verificar_dte()[self.invoice.id]
+            self.assertEqual(estado, 'invalido')
+            self.assertIn('no coincide', mensaje)
+            self.assertEqual(mock_verificar.call_count, 2)
@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""
+Herramientas para pruebas de carga del flujo POS → firmador → MH
+Descripción: Servidores locales que simulan el firmador y la recepción del MH,
+             generador de llegadas y acumulador de métricas; no usan el ORM
+"""
+
+import base64
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _b64url(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+class _ManejadorSimulado(BaseHTTPRequestHandler):
+    """Manejador base: aplica la latencia y la tasa de error del servidor"""
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def _responder(self, estado, cuerpo):
+        data = json.dumps(cuerpo).encode('utf-8')
+        self.send_response(estado)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def _leer_json(self):
+        longitud = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(longitud) or b'{}')
+    
+    def do_GET(self):
+        self._responder(200, {'status': 'OK'})
+    
+    def do_POST(self):
+        payload = self._leer_json()
+        time.sleep(self.server.latencia)
+        # ThreadingHTTPServer atiende cada solicitud en su propio hilo
+        with self.server.lock:
+            self.server.atendidas += 1
+        self._responder(200, self.procesar(payload, random.random() < self.server.tasa_error))
+
+
+class _ManejadorFirmador(_ManejadorSimulado):
+    """Simula /firmardocumento/: retorna un JWS compacto con el dteJson recibido"""
+    
+    def procesar(self, payload, con_error):
+        if con_error:
+            return {'status': 'ERROR', 'body': {'mensaje': 'Error simulado del firmador'}}
+        encabezado = _b64url(json.dumps({'alg': 'RS512'}).encode('utf-8'))
+        contenido = _b64url(json.dumps(payload.get('dteJson', {})).encode('utf-8'))
+        return {'status': 'OK', 'body': f"{encabezado}.{contenido}.{_b64url(uuid.uuid4().bytes)}"}
+
+
+class _ManejadorMH(_ManejadorSimulado):
+    """Simula la recepción de DTE del MH"""
+    
+    def procesar(self, payload, con_error):
+        respuesta = {
+            'version': 2,
+            'ambiente': payload.get('ambiente'),
+            'codigoGeneracion': payload.get('codigoGeneracion'),
+            'fhProcesamiento': datetime.now(timezone.utc).strftime('%d/%m/%Y %H:%M:%S'),
+        }
+        if con_error:
+            respuesta.update(estado='RECHAZADO', selloRecibido=None, descripcionMsg='Rechazo simulado del MH')
+        else:
+            respuesta.update(estado='PROCESADO', selloRecibido=uuid.uuid4().hex.upper(), descripcionMsg='RECIBIDO')
+        return respuesta
+
+
+class ServidorSimulado:
+    """
+    Servidor HTTP local en un hilo propio
+    
+    Args:
+        tipo (str): 'firmador' o 'mh'
+        latencia (float): Segundos de espera por solicitud
+        tasa_error (float): Proporción de respuestas con error (0 a 1)
+    """
+    
+    def __init__(self, tipo, latencia=0.0, tasa_error=0.0):
+        manejador = _ManejadorFirmador if tipo == 'firmador' else _ManejadorMH
+        self._servidor = ThreadingHTTPServer(('127.0.0.1', 0), manejador)
+        self._servidor.daemon_threads = True
+        self._servidor.latencia = latencia
+        self._servidor.tasa_error = tasa_error
+        self._servidor.atendidas = 0
+        self._servidor.lock = threading.Lock()
+        self._hilo = threading.Thread(target=self._servidor.serve_forever, daemon=True)
+    
+    @property
+    def url(self):
+        host, puerto = self._servidor.server_address[:2]
+        return f"http://{host}:{puerto}"
+    
+    @property
+    def atendidas(self):
+        with self._servidor.lock:
+            return self._servidor.atendidas
+    
+    def __enter__(self):
+        self._hilo.start()
+        return self
+    
+    def __exit__(self, *exc):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+
+def llegadas_poisson(tasa, duracion, semilla=None):
+    """
+    Instantes de llegada (segundos desde el inicio) de un proceso de Poisson
+    
+    Args:
+        tasa (float): Llegadas por segundo
+        duracion (float): Duración de la prueba en segundos
+        semilla (int): Semilla para repetir la misma secuencia (opcional)
+    """
+    rng = random.Random(semilla)
+    instante = rng.expovariate(tasa)
+    while instante < duracion:
+        yield instante
+        instante += rng.expovariate(tasa)
+
+
+def percentil(valores, p):
+    """Percentil `p` (0-100) por rango más cercano; `valores` debe estar ordenado"""
+    if not valores:
+        return None
+    indice = max(0, math.ceil(p / 100.0 * len(valores)) - 1)
+    return valores[indice]
+
+
+def _resumen_ms(valores):
+    valores = sorted(valores)
+    if not valores:
+        return {}
+    return {
+        'p50': round(percentil(valores, 50) * 1000, 2),
+        'p90': round(percentil(valores, 90) * 1000, 2),
+        'p95': round(percentil(valores, 95) * 1000, 2),
+        'p99': round(percentil(valores, 99) * 1000, 2),
+        'max': round(valores[-1] * 1000, 2),
+        'promedio': round(sum(valores) / len(valores) * 1000, 2),
+    }
+
+
+class MetricasCarga:
+    """Acumula resultados de las operaciones desde varios hilos"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencias = []
+        self.servicio = []
+        self.documentos = 0
+        self.exitosas = 0
+        self.errores = {}
+    
+    def registrar(self, latencia, servicio, documentos, error=None):
+        """
+        Args:
+            latencia (float): Desde la llegada programada hasta terminar (incluye cola)
+            servicio (float): Desde que un hilo tomó la operación hasta terminar
+            documentos (int): Documentos procesados correctamente en la operación
+            error (str): Tipo de error si la operación falló
+        """
+        with self._lock:
+            self.latencias.append(latencia)
+            self.servicio.append(servicio)
+            self.documentos += documentos
+            if error:
+                self.errores[error] = self.errores.get(error, 0) + 1
+            else:
+                self.exitosas += 1
+    
+    def resumen(self, duracion):
+        with self._lock:
+            completadas = len(self.latencias)
+            fallidas = sum(self.errores.values())
+            return {
+                'operaciones': completadas,
+                'exitosas': self.exitosas,
+                'fallidas': fallidas,
+                'tasa_error': round(fallidas / completadas, 4) if completadas else 0.0,
+                'throughput_ops': round(self.exitosas / duracion, 3) if duracion else 0.0,
+                'throughput_documentos': round(self.documentos / duracion, 3) if duracion else 0.0,
+                'latencia_ms': _resumen_ms(self.latencias),
+                'servicio_ms': _resumen_ms(self.servicio),
+                'errores': dict(self.errores),
+            }
+
+
+class MuestreadorBloqueos:
+    """
+    Muestrea periódicamente las sesiones de base de datos en espera de bloqueos
+    
+    Args:
+        consultar (callable): Retorna la cantidad de sesiones esperando un bloqueo
+        intervalo (float): Segundos entre muestras
+    """
+    
+    def __init__(self, consultar, intervalo=0.25):
+        self._consultar = consultar
+        self._intervalo = intervalo
+        self._detener = threading.Event()
+        self._hilo = threading.Thread(target=self._ejecutar, daemon=True)
+        self.muestras = []
+    
+    def _ejecutar(self):
+        while not self._detener.wait(self._intervalo):
+            self.muestras.append(self._consultar())
+    
+    def __enter__(self):
+        self._hilo.start()
+        return self
+    
+    def __exit__(self, *exc):
+        self._detener.set()
+        self._hilo.join()
+    
+    def resumen(self):
+        muestras = self.muestras
+        con_espera = [m for m in muestras if m]
+        return {
+            'muestras': len(muestras),
+            'muestras_con_espera': len(con_espera),
+            'proporcion_con_espera': round(len(con_espera) / len(muestras), 4) if muestras else 0.0,
+            'max_sesiones_esperando': max(muestras, default=0),
+            'promedio_sesiones_esperando': round(sum(muestras) / len(muestras), 3) if muestras else 0.0,
+            'segundos_espera_estimados': round(sum(muestras) * self._intervalo, 3),
+        }
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""
+Configuración resuelta de DTE por empresa
+Descripción: Valores inmutables de endpoints, credenciales, tiempos de espera y
+             tamaños de pool que usan las rutas de envío; se guardan en la caché
+             de cada worker (res.company._get_config_dte)
+"""
+
+from typing import NamedTuple, Optional, Tuple
+
+# URL de recepción del MH según ambiente
+URLS_MH = {
+    "00": "https://apitest.dtes.mh.gob.sv/fesv/recepciondte",  # Pruebas
+    "01": "https://api.dtes.mh.gob.sv/fesv/recepciondte"       # Producción
+}
+
+
+class ConfigDTE(NamedTuple):
+    """Configuración DTE de una empresa"""
+    company_id: int
+    ambiente: str
+    url_firmador: Optional[str]
+    urls_firmador: Tuple[str, ...]
+    url_mh: str
+    token_mh: Optional[str]
+    password_firma: Optional[str]
+    timeout_firmador: int
+    timeout_mh: int
+    pool_firmador: int
+    certificado_firmador: Optional[bytes]
+    huella_certificado: Optional[str]
+    
+    @property
+    def url_firma(self):
+        """Endpoint de firma del servicio firmador"""
+        return f"{self.url_firmador}/firmardocumento/" if self.url_firmador else None
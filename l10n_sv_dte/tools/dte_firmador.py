@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""
+Cliente del servicio firmador con balanceo entre instancias
+Descripción: Envío al firmador sin acceso al ORM (utilizable desde hilos) y
+             balanceo por menor cantidad de solicitudes pendientes entre las
+             instancias saludables, con verificación de salud y conmutación
+             automática ante fallas. requests.Session no es segura entre
+             hilos: cada hilo usa su propia sesión (SesionesPorHilo)
+"""
+
+import json
+import logging
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+_logger = logging.getLogger(__name__)
+
+# Segundos que una instancia con fallas queda relegada antes de volver a probarla
+ESPERA_REINTENTO = 30
+# Tiempo de espera de la verificación de salud
+TIMEOUT_SALUD = 3
+
+
+def crear_sesion_http(pool=1):
+    """
+    Crea una sesión HTTP con un pool de `pool` conexiones por host
+    
+    Args:
+        pool (int): Conexiones reutilizables por host
+        
+    Returns:
+        requests.Session: Sesión para uso de un solo hilo
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool, pool_maxsize=pool)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class SesionesPorHilo:
+    """
+    Entrega a cada hilo su propia sesión HTTP y las cierra todas al final
+    
+    Las conexiones se reutilizan entre los documentos que procesa un mismo
+    hilo del pool, sin compartir la sesión entre hilos.
+    """
+    
+    def __init__(self, pool=1):
+        self._pool = pool
+        self._local = threading.local()
+        self._sesiones = []
+        self._lock = threading.Lock()
+    
+    def actual(self):
+        """Retorna la sesión del hilo actual, creándola si no existe"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = crear_sesion_http(self._pool)
+            with self._lock:
+                self._sesiones.append(session)
+        return session
+    
+    def cerrar(self):
+        with self._lock:
+            sesiones, self._sesiones = self._sesiones, []
+        for session in sesiones:
+            session.close()
+
+
+def enviar_a_firmar(url, payload, session=None, timeout=30):
+    """
+    Envía el documento al servicio de firma digital
+    
+    Args:
+        url (str): URL del servicio firmador
+        payload (dict): Datos del documento a firmar
+        session (requests.Session): Sesión HTTP compartida (opcional)
+        timeout (int): Tiempo de espera en segundos
+        
+    Returns:
+        dict: Resultado de la operación; 'reintentable' indica una falla de
+            la instancia (conexión, tiempo de espera, error 5xx) y no del documento
+    """
+    headers = {
+        'Content-Type': 'application/json',
+    }
+    
+    try:
+        response = (session or requests).post(
+            url, 
+            headers=headers, 
+            data=json.dumps(payload),
+            timeout=timeout
+        )
+        response.raise_for_status()
+        
+        json_response = response.json()
+        
+        if json_response.get('status') == 'OK':
+            return {
+                'success': True,
+                'documento': json_response.get('body'),
+                'message': 'Documento firmado correctamente'
+            }
+        else:
+            return {
+                'success': False,
+                'message': json_response.get('body', {}).get('mensaje', 'Error desconocido')
+            }
+            
+    except requests.exceptions.Timeout:
+        return {
+            'success': False,
+            'reintentable': True,
+            'message': 'Tiempo de espera agotado al conectar con el servicio'
+        }
+    except requests.exceptions.HTTPError as e:
+        _logger.error(f"Error en servicio de firma: {e}")
+        return {
+            'success': False,
+            'reintentable': e.response is not None and e.response.status_code >= 500,
+            'message': f'Error de conexión: {str(e)}'
+        }
+    except requests.exceptions.RequestException as e:
+        _logger.error(f"Error en servicio de firma: {e}")
+        return {
+            'success': False,
+            'reintentable': True,
+            'message': f'Error de conexión: {str(e)}'
+        }
+    except Exception as e:
+        _logger.error(f"Error inesperado al firmar: {e}")
+        return {
+            'success': False,
+            'message': f'Error inesperado: {str(e)}'
+        }
+
+
+class InstanciaFirmador:
+    """Estado de una instancia del firmador dentro del worker"""
+    __slots__ = ('url', 'pendientes', 'saludable', 'fallo_en')
+    
+    def __init__(self, url):
+        self.url = url
+        self.pendientes = 0
+        self.saludable = True
+        self.fallo_en = 0.0
+
+
+class BalanceadorFirmador:
+    """
+    Reparte las firmas entre varias instancias del firmador
+    
+    Elige la instancia saludable con menos solicitudes en curso. Una instancia
+    que falla queda relegada durante `espera` segundos; después se verifica su
+    salud antes de volver a enviarle documentos. Si todas fallan se intenta
+    igualmente cada una, de modo que nunca se rechaza un documento sin probar.
+    """
+    
+    def __init__(self, urls, espera=ESPERA_REINTENTO, reloj=time.monotonic):
+        self._instancias = [InstanciaFirmador(url) for url in urls]
+        self._espera = espera
+        self._reloj = reloj
+        self._lock = threading.Lock()
+    
+    @property
+    def instancias(self):
+        return list(self._instancias)
+    
+    def _elegir(self, intentadas):
+        """Reserva la mejor instancia aún no intentada"""
+        with self._lock:
+            ahora = self._reloj()
+            candidatas = [i for i in self._instancias if i.url not in intentadas]
+            if not candidatas:
+                return None, False
+            
+            def prioridad(instancia):
+                relegada = not instancia.saludable and ahora - instancia.fallo_en < self._espera
+                return (relegada, not instancia.saludable, instancia.pendientes)
+            
+            instancia = min(candidatas, key=prioridad)
+            instancia.pendientes += 1
+            verificar = not instancia.saludable and ahora - instancia.fallo_en >= self._espera
+            return instancia, verificar
+    
+    def _liberar(self, instancia, disponible):
+        with self._lock:
+            instancia.pendientes -= 1
+            if disponible:
+                if not instancia.saludable:
+                    _logger.info(f"Firmador {instancia.url} disponible nuevamente")
+                instancia.saludable = True
+            else:
+                if instancia.saludable:
+                    _logger.warning(f"Firmador {instancia.url} marcado como no disponible")
+                instancia.saludable = False
+                instancia.fallo_en = self._reloj()
+    
+    def verificar_salud(self, url, session=None):
+        """Cualquier respuesta HTTP de la instancia indica que está en línea"""
+        try:
+            (session or requests).get(url, timeout=TIMEOUT_SALUD)
+            return True
+        except requests.exceptions.RequestException:
+            return False
+    
+    def firmar(self, payload, session=None, timeout=30):
+        """
+        Firma el documento en la mejor instancia disponible, con conmutación
+        
+        Returns:
+            dict: Resultado de enviar_a_firmar con la llave 'firmador'
+        """
+        intentadas = set()
+        resultado = {
+            'success': False,
+            'message': 'No hay instancias del firmador configuradas'
+        }
+        while True:
+            instancia, verificar = self._elegir(intentadas)
+            if instancia is None:
+                return resultado
+            intentadas.add(instancia.url)
+            
+            if verificar and not self.verificar_salud(instancia.url, session=session):
+                self._liberar(instancia, False)
+                resultado = {
+                    'success': False,
+                    'reintentable': True,
+                    'message': f'Firmador {instancia.url} no disponible'
+                }
+                continue
+            
+            resultado = enviar_a_firmar(
+                f"{instancia.url}/firmardocumento/", payload, session=session, timeout=timeout
+            )
+            resultado['firmador'] = instancia.url
+            self._liberar(instancia, not resultado.get('reintentable'))
+            if not resultado.get('reintentable'):
+                return resultado
+
+
+_balanceadores = {}
+_balanceadores_lock = threading.Lock()
+
+
+def obtener_balanceador(urls):
+    """
+    Retorna el balanceador del worker para el conjunto de instancias dado
+    
+    Args:
+        urls (tuple): URLs base de las instancias del firmador
+    """
+    with _balanceadores_lock:
+        balanceador = _balanceadores.get(urls)
+        if balanceador is None:
+            balanceador = _balanceadores[urls] = BalanceadorFirmador(urls)
+        return balanceador
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+Construcción del payload DTE a partir de instantáneas de datos
+Descripción: Funciones puras sobre las instantáneas de dte_snapshot; no
+             acceden al ORM, por lo que pueden ejecutarse fuera de un cursor
+             o en procesos independientes del worker de Odoo
+"""
+
+
+def preparar_items(lineas):
+    """
+    Prepara los items del documento según especificación MH
+    
+    Args:
+        lineas (tuple): LineaSnapshot de la factura
+        
+    Returns:
+        list: Lista de items con estructura requerida
+    """
+    items = []
+    num_item = 1
+    
+    for line in lineas:
+        if line.display_type in ('line_note', 'line_section'):
+            continue
+        
+        precio_unitario = round(line.price_unit * 1.13, 4)  # Precio con IVA
+        venta_gravada = round(line.price_subtotal * 1.13, 4)
+        descuento = round(precio_unitario * line.quantity * (line.discount / 100.0), 4)
+        iva_item = round(line.price_subtotal * 0.13, 4)
+        
+        items.append({
+            "numItem": num_item,
+            "tipoItem": int(line.tipo_item_dte or 1),
+            "numeroDocumento": None,
+            "cantidad": line.quantity,
+            "codigo": line.default_code[:25] if line.default_code else None,
+            "codTributo": None,
+            "uniMedida": 59,  # Unidad
+            "descripcion": line.name[:1000],
+            "precioUni": precio_unitario,
+            "montoDescu": descuento,
+            "ventaNoSuj": 0.00,
+            "ventaExenta": 0.00,
+            "ventaGravada": venta_gravada,
+            "tributos": None,
+            "psv": line.price_unit,
+            "noGravado": 0.00,
+            "ivaItem": iva_item
+        })
+        num_item += 1
+    
+    return items
+
+
+def preparar_receptor(partner):
+    """Prepara información del receptor/cliente a partir de un PartnerSnapshot"""
+    return {
+        "tipoDocumento": "36",  # DUI por defecto
+        "numDocumento": partner.vat or "0000000000",
+        "nrc": partner.registro_comercial,
+        "nombre": partner.name[:200],
+        "codActividad": None,
+        "descActividad": None,
+        "direccion": {
+            "departamento": partner.state_code[:2] if partner.state_code else "01",
+            "municipio": "01",
+            "complemento": partner.street[:200] if partner.street else "Ciudad"
+        },
+        "telefono": partner.phone[:25] if partner.phone else None,
+        "correo": partner.email[:100] if partner.email else None
+    }
+
+
+def preparar_emisor(company):
+    """Prepara información del emisor/empresa a partir de un CompaniaSnapshot"""
+    return {
+        "nit": company.vat or "0000000000000",
+        "nrc": company.registro_comercial,
+        "nombre": company.name[:200],
+        "codActividad": company.codigo_actividad,
+        "descActividad": company.desc_actividad,
+        "nombreComercial": company.name[:200],
+        "tipoEstablecimiento": "01",
+        "direccion": {
+            "departamento": "01",
+            "municipio": "01",
+            "complemento": company.street[:200] if company.street else "San Salvador"
+        },
+        "telefono": company.phone[:25] if company.phone else "0000-0000",
+        "correo": company.email[:100],
+        "codEstableMH": None,
+        "codEstable": None,
+        "codPuntoVentaMH": None,
+        "codPuntoVenta": None
+    }
+
+
+def preparar_resumen(factura):
+    """Prepara el resumen financiero del documento"""
+    total_gravado = round(factura.amount_untaxed * 1.13, 2)
+    total_iva = round(factura.amount_tax, 2)
+    
+    return {
+        "totalNoSuj": 0.00,
+        "totalExenta": 0.00,
+        "totalGravada": total_gravado,
+        "subTotalVentas": total_gravado,
+        "descuNoSuj": 0.00,
+        "descuExenta": 0.00,
+        "descuGravada": 0.00,
+        "porcentajeDescuento": 0.00,
+        "totalDescu": 0.00,
+        "tributos": None,
+        "subTotal": total_gravado,
+        "ivaRete1": 0.00,
+        "reteRenta": 0.00,
+        "montoTotalOperacion": total_gravado,
+        "totalNoGravado": 0.00,
+        "totalPagar": factura.amount_total,
+        "totalLetras": factura.amount_to_text,
+        "totalIva": total_iva,
+        "saldoFavor": 0.00,
+        "condicionOperacion": 1,  # 1: Contado, 2: Crédito
+        "pagos": None,
+        "numPagoElectronico": None
+    }
+
+
+def preparar_extension(factura):
+    """Prepara datos de extensión del documento"""
+    return {
+        "nombEntrega": None,
+        "docuEntrega": None,
+        "nombRecibe": None,
+        "docuRecibe": None,
+        "observaciones": factura.narration[:3000] if factura.narration else None,
+        "placaVehiculo": None
+    }
+
+
+def preparar_apendice(factura):
+    """Prepara información adicional en apéndice"""
+    return [
+        {
+            "campo": "numeroInterno",
+            "etiqueta": "Número Interno",
+            "valor": factura.payment_reference or factura.name
+        }
+    ]
+
+
+def construir_payload_dte(factura, codigo_generacion, marca):
+    """
+    Construye el payload completo para el servicio de firma
+    
+    Args:
+        factura (FacturaSnapshot): Datos del documento
+        codigo_generacion (str): UUID del DTE
+        marca (MarcaEmision): Fecha y hora de emisión en El Salvador; de ella
+            salen tanto fecEmi como horEmi para que siempre sean coherentes
+        
+    Returns:
+        dict: Estructura completa del DTE según especificaciones MH
+    """
+    company = factura.company
+    
+    dte_json = {
+        "identificacion": {
+            "version": 1,
+            "ambiente": company.ambiente_dte or "00",  # 00: Pruebas, 01: Producción
+            "tipoDte": "01",  # Factura
+            "numeroControl": factura.name,
+            "codigoGeneracion": codigo_generacion,
+            "tipoModelo": 1,
+            "tipoOperacion": 1,
+            "fecEmi": marca.fecha,
+            "horEmi": marca.hora,
+            "tipoMoneda": "USD"
+        },
+        "emisor": preparar_emisor(company),
+        "receptor": preparar_receptor(factura.partner),
+        "cuerpoDocumento": preparar_items(factura.lineas),
+        "resumen": preparar_resumen(factura),
+        "extension": preparar_extension(factura),
+        "apendice": preparar_apendice(factura)
+    }
+    
+    return {
+        "nit": company.vat or "0000000000000",
+        "activo": True,
+        "passwordPri": company.password_firma_dte,
+        "dteJson": dte_json
+    }
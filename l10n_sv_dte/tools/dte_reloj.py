@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Reloj de El Salvador para la emisión de DTE
+Descripción: Resuelve la zona horaria una sola vez y entrega fecha y hora de
+             emisión (fecEmi/horEmi) consistentes para todo un lote; acepta
+             un reloj inyectable para pruebas y mediciones deterministas
+"""
+
+from datetime import datetime
+from typing import NamedTuple
+
+import pytz
+
+TZ_EL_SALVADOR = pytz.timezone('America/El_Salvador')
+
+
+def _ahora_utc():
+    return datetime.now(pytz.utc)
+
+
+class MarcaEmision(NamedTuple):
+    """Instante de emisión en hora de El Salvador"""
+    fecha: str  # fecEmi (AAAA-MM-DD)
+    hora: str  # horEmi (HH:MM:SS)
+    momento: datetime
+
+
+class RelojSV:
+    """
+    Reloj en hora de El Salvador
+    
+    Args:
+        ahora (callable): Función sin argumentos que retorna el instante actual;
+            un datetime sin zona horaria se interpreta como UTC
+    """
+    __slots__ = ('_ahora',)
+    
+    def __init__(self, ahora=None):
+        self._ahora = ahora or _ahora_utc
+    
+    def ahora(self):
+        """Retorna el instante actual en hora de El Salvador"""
+        momento = self._ahora()
+        if momento.tzinfo is None:
+            momento = pytz.utc.localize(momento)
+        return momento.astimezone(TZ_EL_SALVADOR)
+    
+    def marca(self):
+        """Retorna la marca de emisión para un documento o un lote completo"""
+        momento = self.ahora()
+        return MarcaEmision(momento.strftime('%Y-%m-%d'), momento.strftime('%H:%M:%S'), momento)
+
+
+def reloj_fijo(momento):
+    """Reloj que siempre retorna `momento` (pruebas y benchmarks)"""
+    return RelojSV(lambda: momento)
+
+
+# Instancia compartida por el worker
+RELOJ_SV = RelojSV()
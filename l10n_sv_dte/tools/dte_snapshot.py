@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Instantáneas inmutables de los datos que usa el DTE
+Descripción: Copias planas (sin ORM) de factura, líneas, cliente y empresa;
+             se llenan en bloque con account.move._cargar_snapshots_dte y
+             alimentan las funciones puras de dte_payload
+"""
+
+from datetime import date
+from typing import NamedTuple, Optional, Tuple
+
+
+class LineaSnapshot(NamedTuple):
+    """Línea de factura"""
+    display_type: Optional[str]
+    name: str
+    quantity: float
+    price_unit: float
+    price_subtotal: float
+    discount: float
+    tipo_item_dte: Optional[int]
+    default_code: Optional[str]
+
+
+class PartnerSnapshot(NamedTuple):
+    """Cliente/receptor"""
+    vat: Optional[str]
+    name: str
+    state_code: Optional[str]
+    street: Optional[str]
+    phone: Optional[str]
+    email: Optional[str]
+    registro_comercial: Optional[str]
+
+
+class CompaniaSnapshot(NamedTuple):
+    """Empresa/emisor"""
+    vat: Optional[str]
+    name: str
+    street: Optional[str]
+    phone: Optional[str]
+    email: Optional[str]
+    ambiente_dte: Optional[str]
+    password_firma_dte: Optional[str]
+    registro_comercial: Optional[str]
+    codigo_actividad: Optional[str]
+    desc_actividad: Optional[str]
+
+
+class FacturaSnapshot(NamedTuple):
+    """Factura con sus líneas, cliente y empresa"""
+    id: int
+    name: str
+    invoice_date: Optional[date]
+    amount_untaxed: float
+    amount_tax: float
+    amount_total: float
+    amount_to_text: Optional[str]
+    narration: Optional[str]
+    payment_reference: Optional[str]
+    lineas: Tuple[LineaSnapshot, ...]
+    partner: PartnerSnapshot
+    company: CompaniaSnapshot
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+Verificación de documentos DTE firmados
+Descripción: Valida la firma JWS del documento firmado con el certificado
+             público del firmador y compara su contenido con el JSON original;
+             funciones puras utilizables desde un pool de procesos
+"""
+
+import base64
+import hashlib
+import json
+import xml.etree.ElementTree as ET
+
+from cryptography import x509
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding
+
+# Algoritmos JWS soportados: (hash, usa PSS)
+ALGORITMOS_JWS = {
+    'RS256': (hashes.SHA256, False),
+    'RS384': (hashes.SHA384, False),
+    'RS512': (hashes.SHA512, False),
+    'PS256': (hashes.SHA256, True),
+    'PS384': (hashes.SHA384, True),
+    'PS512': (hashes.SHA512, True),
+}
+
+
+def _b64url_decode(texto):
+    return base64.urlsafe_b64decode(texto + '=' * (-len(texto) % 4))
+
+
+def json_canonico(data):
+    """Serialización canónica (llaves ordenadas, sin espacios) para comparar contenido"""
+    return json.dumps(data, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+
+def huella_certificado(certificado):
+    """Huella SHA-256 del certificado del firmador"""
+    return hashlib.sha256(certificado).hexdigest() if certificado else None
+
+
+def huella_artefactos(documento_firmado, json_data, huella_cert):
+    """
+    Huella de los artefactos guardados; si cambia alguno (o el certificado)
+    el veredicto en caché deja de ser válido
+    """
+    digest = hashlib.sha256()
+    for parte in (documento_firmado, json_data, huella_cert):
+        digest.update((parte or '').encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def cargar_clave_publica(certificado):
+    """
+    Carga la clave pública del firmador
+    
+    Acepta un certificado X.509 (PEM o DER), una clave pública PEM o el
+    archivo .crt en XML que entrega el MH (publicKey/encodied en base64).
+    """
+    data = certificado.strip()
+    if data.startswith(b'<'):
+        raiz = ET.fromstring(data)
+        encodied = raiz.find('.//publicKey/encodied')
+        if encodied is None or not encodied.text:
+            raise ValueError('El certificado XML no contiene publicKey/encodied')
+        return serialization.load_der_public_key(base64.b64decode(encodied.text))
+    if b'-----BEGIN CERTIFICATE-----' in data:
+        return x509.load_pem_x509_certificate(data).public_key()
+    if b'-----BEGIN PUBLIC KEY-----' in data:
+        return serialization.load_pem_public_key(data)
+    return x509.load_der_x509_certificate(data).public_key()
+
+
+def verificar_documento(documento_firmado, json_data, certificado):
+    """
+    Verifica la firma JWS y que el contenido firmado coincida con el JSON original
+    
+    Args:
+        documento_firmado (str): JWS compacto devuelto por el firmador
+        json_data (str): JSON original del DTE
+        certificado (bytes): Certificado público del firmador
+        
+    Returns:
+        tuple: (estado, mensaje) con estado 'valido' o 'invalido'
+    """
+    if not documento_firmado:
+        return 'invalido', 'No hay documento firmado'
+    
+    partes = documento_firmado.split('.')
+    if len(partes) != 3:
+        return 'invalido', 'El documento firmado no tiene formato JWS compacto'
+    
+    try:
+        encabezado = json.loads(_b64url_decode(partes[0]))
+        contenido = _b64url_decode(partes[1])
+        firma = _b64url_decode(partes[2])
+    except ValueError:
+        return 'invalido', 'El documento firmado no se puede decodificar'
+    
+    algoritmo = ALGORITMOS_JWS.get(encabezado.get('alg'))
+    if not algoritmo:
+        return 'invalido', f"Algoritmo de firma no soportado: {encabezado.get('alg')}"
+    hash_cls, usa_pss = algoritmo
+    
+    try:
+        clave = cargar_clave_publica(certificado)
+        relleno = (
+            padding.PSS(mgf=padding.MGF1(hash_cls()), salt_length=hash_cls.digest_size)
+            if usa_pss else padding.PKCS1v15()
+        )
+        clave.verify(firma, f"{partes[0]}.{partes[1]}".encode('ascii'), relleno, hash_cls())
+    except InvalidSignature:
+        return 'invalido', 'La firma no corresponde al certificado del firmador'
+    except (ValueError, TypeError, ET.ParseError) as e:
+        return 'invalido', f'No se pudo cargar el certificado: {str(e)}'
+    
+    try:
+        firmado = json.loads(contenido)
+        original = json.loads(json_data) if json_data else None
+    except ValueError:
+        return 'invalido', 'El contenido firmado o el JSON original no es JSON válido'
+    
+    if json_canonico(firmado) != json_canonico(original):
+        return 'invalido', 'El contenido firmado no coincide con el JSON original'
+    
+    return 'valido', 'Firma y contenido verificados'
+
+
+def verificar_documento_args(args):
+    """Adaptador de verificar_documento para pool.map: ((id, documento, json, cert)) → (id, veredicto)"""
+    move_id, documento_firmado, json_data, certificado = args
+    return move_id, verificar_documento(documento_firmado, json_data, certificado)
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+Asistente de exportación de DTE firmados para auditoría
+"""
+
+from urllib.parse import urlencode
+
+from odoo import fields, models
+from odoo.exceptions import UserError
+
+
+class AccountMoveDteExport(models.TransientModel):
+    _name = 'account.move.dte.export'
+    _description = 'Exportar DTE firmados (ZIP)'
+    
+    fecha_desde = fields.Date(
+        string='Desde',
+        required=True,
+        default=lambda self: fields.Date.context_today(self).replace(day=1)
+    )
+    fecha_hasta = fields.Date(
+        string='Hasta',
+        required=True,
+        default=fields.Date.context_today
+    )
+    
+    def action_exportar(self):
+        """Descarga el ZIP generado por el controlador de exportación"""
+        self.ensure_one()
+        
+        if self.fecha_desde > self.fecha_hasta:
+            raise UserError('La fecha inicial no puede ser mayor que la fecha final.')
+        
+        params = urlencode({
+            'fecha_desde': fields.Date.to_string(self.fecha_desde),
+            'fecha_hasta': fields.Date.to_string(self.fecha_hasta),
+            'company_ids': ','.join(str(cid) for cid in self.env.companies.ids),
+        })
+        return {
+            'type': 'ir.actions.act_url',
+            'url': f'/l10n_sv_dte/exportar_zip?{params}',
+            'target': 'self',
+        }
+    
+    def action_verificar(self):
+        """Encola la verificación de las firmas de los DTE del rango"""
+        self.ensure_one()
+        
+        if self.fecha_desde > self.fecha_hasta:
+            raise UserError('La fecha inicial no puede ser mayor que la fecha final.')
+        
+        encolados = self.env['account.move']._encolar_verificacion_dte(
+            self.fecha_desde, self.fecha_hasta, self.env.companies.ids
+        )
+        if not encolados:
+            raise UserError('No hay DTE firmados en el rango seleccionado.')
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'message': (
+                    f"DTE encolados para verificar: {encolados}. "
+                    "El resultado quedará en la pestaña DTE de cada factura."
+                ),
+                'type': 'success',
+                'sticky': False,
+            }
+        }